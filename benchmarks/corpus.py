@@ -0,0 +1,143 @@
+# benchmarks/corpus.py
+
+import random
+import textwrap
+from pathlib import Path
+
+
+SIZES = {
+    "1KB": 1024,
+    "100KB": 100 * 1024,
+    "1MB": 1024 * 1024,
+    "10MB": 10 * 1024 * 1024,
+    "50MB": 50 * 1024 * 1024,
+}
+
+FORMATS = ("txt", "docx", "pdf")
+
+# Ordered by rank: words are drawn with Zipf-like weights so that the
+# frequency tables look like those of natural text.
+VOCABULARY = """
+the of and to a in is it that was he for on are as with his they at be this
+have from or one had by word but not what all were we when your can said there
+use an each which she do how their if will up other about out many then them
+these so some her would make like him into time has look two more write go see
+number no way could people my than first water been call who oil its now find
+long down day did get come made may part good great small happy strong clear
+bad poor terrible wonderful beautiful awful simple difficult important famous
+analysis document information community government development environment
+understanding relationship responsibility organization interesting particular
+available political national economic traditional significant certainly really
+very never quite rather extremely probably usually especially generally
+""".split()
+
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+PUNCTUATION = [".", ".", ".", ".", "!", "?"]
+
+
+def iter_paragraphs(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    written = 0
+    while written < size:
+        sentences = []
+        for _ in range(rng.randint(3, 8)):
+            words = rng.choices(VOCABULARY, WEIGHTS, k=rng.randint(5, 20))
+            if rng.random() < 0.3:
+                words.insert(rng.randint(1, len(words) - 1), ",")
+            sentence = " ".join(words).replace(" ,", ",")
+            sentences.append(sentence[0].upper() + sentence[1:] + rng.choice(PUNCTUATION))
+        paragraph = " ".join(sentences)
+        written += len(paragraph) + 1
+        yield paragraph
+
+
+def generate_text(size: int, seed: int = 0) -> str:
+    return "\n".join(iter_paragraphs(size, seed))
+
+
+def write_txt(path, paragraphs):
+    with open(path, "w", encoding="utf-8") as f:
+        for paragraph in paragraphs:
+            f.write(paragraph + "\n")
+
+
+def write_docx(path, paragraphs):
+    from docx import Document
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    document.save(path)
+
+
+def write_pdf(
+    path,
+    paragraphs,
+    lines_per_page=60,
+    width=95
+    ):
+    # A minimal PDF writer: one Helvetica text object per page, written page
+    # by page so that large corpora never sit in memory.
+    with open(path, "wb") as f:
+        offsets = {}
+
+        def write_object(number, body: bytes):
+            offsets[number] = f.tell()
+            f.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        def write_page(lines):
+            content = ["BT /F1 10 Tf 12 TL 40 760 Td"]
+            for line in lines:
+                escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+                content.append(f"({escaped}) Tj T*")
+            content.append("ET")
+            stream = "\n".join(content).encode("latin-1", "replace")
+            number = 4 + 2 * len(pages)
+            write_object(number + 1, b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+            write_object(number, (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {number + 1} 0 R >>"
+            ).encode())
+            pages.append(number)
+
+        f.write(b"%PDF-1.4\n")
+        write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        write_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        pages = []
+        lines = []
+        for paragraph in paragraphs:
+            lines.extend(textwrap.wrap(paragraph, width) + [""])
+            while len(lines) >= lines_per_page:
+                write_page(lines[:lines_per_page])
+                lines = lines[lines_per_page:]
+        if lines or not pages:
+            write_page(lines)
+        kids = " ".join(f"{number} 0 R" for number in pages)
+        write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+        xref = f.tell()
+        size = max(offsets) + 1
+        f.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode())
+        for number in range(1, size):
+            f.write(f"{offsets[number]:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+WRITERS = {
+    "txt": write_txt,
+    "docx": write_docx,
+    "pdf": write_pdf,
+}
+
+
+def write_corpus(
+    directory,
+    size_label: str,
+    fmt: str,
+    seed: int = 0
+    ) -> Path:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"corpus_{size_label}_{seed}.{fmt}"
+    if not path.exists():
+        WRITERS[fmt](path, iter_paragraphs(SIZES[size_label], seed))
+    return path
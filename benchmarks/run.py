@@ -0,0 +1,260 @@
+# benchmarks/run.py
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from config import MODULE_MAP, CHUNK_SIZE
+from benchmarks.corpus import SIZES, FORMATS, write_corpus
+
+
+DEFAULT_SIZES = ["1KB", "100KB", "1MB"]
+
+DEFAULT_TOLERANCE = 0.25
+
+# Differences below this many seconds are treated as noise.
+NOISE_FLOOR = 0.005
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def benchmark_corpus(
+    path,
+    focus,
+    chunk_size=CHUNK_SIZE
+    ) -> dict:
+    import analyzer as analyzer_module
+    from analyzer import Analyzer, load_spacy_model, required_pipes
+    from utils.load import load_files
+    from utils.report import save_report
+
+    # Drop cached models so model_load is measured cold on every run.
+    analyzer_module._MODELS.clear()
+    timings = {}
+    (text,), timings["load_files"] = timed(lambda: list(load_files([path])))
+    nlp, timings["model_load"] = timed(load_spacy_model, pipes=required_pipes(focus))
+    if len(text) <= nlp.max_length:
+        # What a default run does: the whole text in one Doc, and each
+        # module's analyze().
+        doc, timings["parse"] = timed(nlp, text)
+        analyzer = Analyzer(text, focus, doc=doc)
+        analyzer.plug_modules(focus)
+        analysis = {}
+        for module in analyzer.modules:
+            analysis[module.name], timings[f"module.{module.name}"] = timed(module.analyze)
+    else:
+        analysis = benchmark_chunks(text, focus, nlp, chunk_size, timings)
+    _, timings["save_report"] = timed(save_report, analysis, "benchmark", "txt")
+    timings["characters"] = len(text)
+    return timings
+
+
+def benchmark_chunks(text, focus, nlp, chunk_size, timings) -> dict:
+    from analyzer import Analyzer
+    from utils.chunk import iter_chunks
+
+    timings["parse"] = 0.0
+    partials = {}
+    modules = {}
+    # Texts beyond spaCy's max_length are parsed and analyzed chunk by chunk,
+    # as with --stream, with each module's time summed over chunks.
+    for chunk in iter_chunks(text, chunk_size):
+        doc, elapsed = timed(nlp, chunk)
+        timings["parse"] += elapsed
+        analyzer = Analyzer(chunk, focus, doc=doc)
+        analyzer.plug_modules(focus)
+        for module in analyzer.modules:
+            key = f"module.{module.name}"
+            start = time.perf_counter()
+            partial = module.partial()
+            if module.name in partials:
+                partial = module.merge(partials[module.name], partial)
+            partials[module.name] = partial
+            timings[key] = timings.get(key, 0.0) + time.perf_counter() - start
+            modules[module.name] = module
+    analysis = {}
+    for name, partial in partials.items():
+        analysis[name], elapsed = timed(modules[name].finalize, partial)
+        timings[f"module.{name}"] += elapsed
+    return analysis
+
+
+def run(
+    sizes,
+    formats,
+    focus,
+    corpus_dir,
+    repeat=1,
+    seed=0
+    ) -> dict:
+    import spacy
+    results = {}
+    for size in sizes:
+        for fmt in formats:
+            path = write_corpus(corpus_dir, size, fmt, seed)
+            runs = [benchmark_corpus(path, focus) for _ in range(repeat)]
+            # The fastest run is the least disturbed by the rest of the system.
+            results[f"{fmt}/{size}"] = {
+                phase: min(run[phase] for run in runs) for phase in runs[0]
+            }
+            print(f"{fmt}/{size}: " + ", ".join(
+                f"{phase}={value:.4f}" for phase, value in results[f"{fmt}/{size}"].items()
+                if phase != "characters"
+            ), file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "spacy": spacy.__version__,
+            "focus": focus,
+            "seed": seed,
+            "repeat": repeat,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    tolerance: float = DEFAULT_TOLERANCE,
+    tolerances: dict = None,
+    noise_floor: float = NOISE_FLOOR
+    ) -> list:
+    tolerances = tolerances or {}
+    regressions = []
+    for corpus, phases in baseline["results"].items():
+        for phase, expected in phases.items():
+            if phase == "characters" or phase not in current["results"].get(corpus, {}):
+                continue
+            actual = current["results"][corpus][phase]
+            limit = expected * (1 + tolerances.get(phase, tolerance))
+            if actual > limit and actual - expected > noise_floor:
+                regressions.append({
+                    "corpus": corpus,
+                    "phase": phase,
+                    "baseline": expected,
+                    "current": actual,
+                    "ratio": round(actual / expected, 2) if expected else None,
+                })
+    return regressions
+
+
+def parse_tolerances(items) -> dict:
+    tolerances = {}
+    for item in items or []:
+        phase, _, value = item.partition("=")
+        tolerances[phase] = float(value)
+    return tolerances
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark climt on deterministic synthetic corpora."
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        choices=list(SIZES),
+        default=DEFAULT_SIZES,
+        help="Corpus sizes to benchmark"
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=FORMATS,
+        default=list(FORMATS),
+        help="Corpus formats to benchmark"
+    )
+    parser.add_argument(
+        "--analyze",
+        nargs="+",
+        choices=list(MODULE_MAP),
+        default=list(MODULE_MAP),
+        help="Modules to benchmark"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Runs per corpus; the fastest one is kept"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the synthetic corpora"
+    )
+    parser.add_argument(
+        "--corpus-dir",
+        default=os.path.join(tempfile.gettempdir(), "climt-benchmarks"),
+        help="Where generated corpora are kept between runs"
+    )
+    parser.add_argument(
+        "--out",
+        default="benchmark.json",
+        help="Where to write the results"
+    )
+    parser.add_argument(
+        "--baseline",
+        help="Results of a previous run to compare against"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed slowdown relative to the baseline (0.25 = 25%%)"
+    )
+    parser.add_argument(
+        "--phase-tolerance",
+        nargs="*",
+        metavar="PHASE=TOLERANCE",
+        help="Per-phase tolerances, e.g. module.sent=0.5 parse=0.1"
+    )
+    args = parser.parse_args()
+
+    out = Path(args.out).resolve()
+    corpus_dir = Path(args.corpus_dir).resolve()
+    # Reports are written to REPORT_DIR, relative to the working directory.
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            current = run(args.sizes, args.formats, args.analyze, corpus_dir, args.repeat, args.seed)
+        finally:
+            os.chdir(cwd)
+    with open(out, "w") as f:
+        json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(
+            current,
+            baseline,
+            args.tolerance,
+            parse_tolerances(args.phase_tolerance)
+        )
+        for r in regressions:
+            print(f"REGRESSION {r['corpus']} {r['phase']}: {r['baseline']:.4f}s -> {r['current']:.4f}s (x{r['ratio']})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,192 @@
 # src/analyzer.py
 
+import copy
 import spacy
-from spacy.cli import download
 import string
-from config import MODULE_MAP
+import threading
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    MODULE_MAP,
+    SPACY_MODEL,
+    SPACY_PIPES,
+    PIPE_DEPENDENCIES,
+    PIPE_BATCH_SIZE,
+    PIPE_N_PROCESS,
+    MODULE_WORKERS,
+    SAMPLE_UNIT,
+    SAMPLE_BOOTSTRAP,
+    SAMPLE_CONFIDENCE
+)
+from utils.timings import phase, iter_phase
+from utils.chunk import iter_chunks
+from utils.load import iter_file, iter_files
+from utils.tokens import TokenTable
 
 
-def load_spacy_model(name="en_core_web_sm"):
-    try:
-        return spacy.load(name)
-    except OSError:
-        print(f"Downloading spaCy model '{name}'...")
-        download(name)
-        return spacy.load(name)
+# Loaded pipelines, shared by every Analyzer in the process and keyed by
+# model name plus the components excluded from it.
+_MODELS = {}
+_MODELS_LOCK = threading.Lock()
+
+# Inputs a module can declare, each mapped to the Analyzer method that
+# computes it.
+INPUTS = {
+    "text": "get_text",
+    "doc": "get_doc",
+    "tokens": "build_token_table",
+    "sents": "split_sentences",
+    "sentences": "strip_sentences",
+    "paragraphs": "split_paragraphs",
+    "words": "tokenize_text",
+    "lower_words": "lowercase_words"
+}
+
+
+def resolve_pipes(pipes) -> set:
+    resolved = set()
+    pending = list(pipes)
+    while pending:
+        pipe = pending.pop()
+        if pipe not in resolved:
+            resolved.add(pipe)
+            pending.extend(PIPE_DEPENDENCIES.get(pipe, ()))
+    return resolved
+
+
+def required_pipes(focus, options=None) -> set:
+    options = options or {}
+    pipes = set()
+    for f in focus:
+        if f in MODULE_MAP:
+            pipes.update(MODULE_MAP[f].required_pipes(**options.get(f, {})))
+    return resolve_pipes(pipes)
+
+
+def load_spacy_model(name=SPACY_MODEL, pipes=None):
+    if pipes is None:
+        enabled, exclude = set(), ()
+    else:
+        enabled = resolve_pipes(pipes)
+        exclude = tuple(sorted(set(SPACY_PIPES) - enabled))
+    key = (name, exclude)
+    with _MODELS_LOCK:
+        if key not in _MODELS:
+            try:
+                nlp = spacy.load(name, exclude=exclude)
+            except OSError:
+                from spacy.cli import download
+                print(f"Downloading spaCy model '{name}'...")
+                download(name)
+                nlp = spacy.load(name, exclude=exclude)
+            for pipe in enabled & set(nlp.disabled):
+                nlp.enable_pipe(pipe)
+            _MODELS[key] = nlp
+        return _MODELS[key]
 
 
 class Analyzer():
 
-    def __init__(self, text):
+    __slots__ = (
+        "text",
+        "focus",
+        "timings",
+        "lean",
+        "nlp",
+        "doc",
+        "_inputs",
+        "_inputs_lock",
+        "_users",
+        "_preprocessed_text",
+        "_preprocessed_words",
+        "modules",
+        "analysis"
+    )
+
+    def __init__(
+        self,
+        text,
+        focus=None,
+        doc=None,
+        cache=None,
+        timings=None,
+        lean=False,
+        options=None
+        ):
         self.text = text
-        self.nlp = load_spacy_model()
-        self.doc = self.nlp(text)
-        self.words = self.tokenize_text()
+        self.focus = focus
+        self.timings = timings
+        # A lean analyzer drops each input once the modules that declare it
+        # are done, and the text and Doc once the analysis is complete.
+        self.lean = lean
+        pipes = None if focus is None else required_pipes(focus, options)
+        with phase(timings, "model_load"):
+            self.nlp = load_spacy_model(pipes=pipes)
+        if doc is None:
+            with phase(timings, "parse"):
+                doc = self.parse(text, cache)
+        self.doc = doc
+        if timings is not None:
+            timings.count(tokens=len(doc))
+        self._inputs = {}
+        self._inputs_lock = threading.RLock()
+        self._users = {}
         self._preprocessed_text = None
         self._preprocessed_words = None
         self.modules = []
         self.analysis = {}
 
+    def parse(self, text, cache=None):
+        if cache is None:
+            return self.nlp(text)
+        key = cache.key(text, self.nlp)
+        doc = cache.get(key, self.nlp)
+        if doc is None:
+            doc = self.nlp(text)
+            cache.put(key, doc)
+        return doc
+
+    def get_input(self, name):
+        # Each input is computed once, whichever module asks for it first.
+        with self._inputs_lock:
+            if name not in self._inputs:
+                self._inputs[name] = getattr(self, INPUTS[name])()
+            return self._inputs[name]
+
+    @property
+    def words(self) -> list:
+        return self.get_input("words")
+
     def get_text(self) -> str:
         return self.text
 
+    def get_doc(self):
+        return self.doc
+
+    def build_token_table(self) -> TokenTable:
+        return TokenTable(self.doc)
+
     def get_words(self) -> list:
-        return self.words
+        return self.get_input("words")
 
     def get_sentences(self) -> list:
-        return [sent.text.strip() for sent in self.doc.sents]
+        return self.get_input("sentences")
+
+    def split_sentences(self) -> list:
+        return [sent for sent in self.doc.sents if not sent.text.isspace()]
+
+    def strip_sentences(self) -> list:
+        return [sent.text.strip() for sent in self.get_input("sents")]
+
+    def split_paragraphs(self) -> list:
+        return [p for p in self.text.split("\n") if p.strip()]
 
     def tokenize_text(self) -> list:
         return [token.text for token in self.doc if token.is_alpha]
 
+    def lowercase_words(self) -> list:
+        return [token.lower_ for token in self.doc if token.is_alpha]
+
     @property
     def preprocessed_text(self):
         if self._preprocessed_text is None:
@@ -70,13 +218,246 @@ class Analyzer():
                 tokens.append(token.text.lower())
         return " ".join(tokens)
 
-    def plug_modules(self, focus):
+    def plug_modules(self, focus, options=None):
+        options = options or {}
         for f in focus:
             if f in MODULE_MAP:
-                module = MODULE_MAP[f](self)
+                module = MODULE_MAP[f](self, **options.get(f, {}))
                 module.plug()
 
-    def generate_analysis(self):
+    def run_module(self, module, method):
+        with phase(self.timings, f"module.{module.name}"):
+            result = getattr(module, method)()
+        if self.lean:
+            self.release_inputs(module)
+        return result
+
+    def release_inputs(self, module):
+        with self._inputs_lock:
+            for name in module.inputs:
+                self._users[name] -= 1
+                if not self._users[name]:
+                    self._inputs.pop(name, None)
+
+    def release(self):
+        with self._inputs_lock:
+            self._inputs.clear()
+        self._preprocessed_text = None
+        self._preprocessed_words = None
+        self.text = None
+        self.doc = None
+
+    def run_modules(self, method="analyze", max_workers=MODULE_WORKERS) -> dict:
+        # Per-module timings need the modules to run one at a time.
+        if self.timings is not None or len(self.modules) <= 1:
+            max_workers = 1
+        if self.lean:
+            self._users = {}
+            for module in self.modules:
+                for name in module.inputs:
+                    self._users[name] = self._users.get(name, 0) + 1
+        if max_workers <= 1:
+            return {module.name: self.run_module(module, method) for module in self.modules}
+        needed = []
         for module in self.modules:
-            self.analysis[module.name] = module.analyze()
-        return self.analysis
\ No newline at end of file
+            needed.extend(name for name in module.inputs if name not in needed)
+        pending = list(self.modules)
+        futures = {}
+        with ThreadPoolExecutor(max_workers) as pool:
+            # Inputs are computed here in order of first use, and each module
+            # is handed to the pool as soon as all of its inputs are ready.
+            for name in [None] + needed:
+                if name is not None:
+                    self.get_input(name)
+                with self._inputs_lock:
+                    ready = set(self._inputs)
+                for module in list(pending):
+                    if all(i in ready for i in module.inputs):
+                        futures[module.name] = pool.submit(self.run_module, module, method)
+                        pending.remove(module)
+            return {module.name: futures[module.name].result() for module in self.modules}
+
+    def generate_analysis(self):
+        self.analysis.update(self.run_modules("analyze"))
+        if self.lean:
+            self.release()
+        return self.analysis
+
+
+def parse_corpus(
+    nlp,
+    texts,
+    cache=None,
+    batch_size=PIPE_BATCH_SIZE,
+    n_process=PIPE_N_PROCESS):
+    if cache is None:
+        yield from nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        return
+    # Texts are looked up a batch at a time, so that no more than a batch is
+    # read ahead of the documents yielded.
+    texts = iter(texts)
+    while True:
+        batch = list(islice(texts, batch_size))
+        if not batch:
+            return
+        keys = [cache.key(text, nlp) for text in batch]
+        cached = [cache.contains(key) for key in keys]
+        misses = [text for text, hit in zip(batch, cached) if not hit]
+        docs = nlp.pipe(misses, batch_size=batch_size, n_process=n_process) if misses else iter(())
+        for text, key, hit in zip(batch, keys, cached):
+            doc = cache.get(key, nlp) if hit else None
+            if doc is None:
+                # Entries evicted since the lookup are parsed on their own.
+                doc = nlp(text) if hit else next(docs)
+                cache.put(key, doc)
+            yield doc
+
+
+def analyze_corpus(
+    texts,
+    focus,
+    batch_size=PIPE_BATCH_SIZE,
+    n_process=PIPE_N_PROCESS,
+    cache=None,
+    options=None,
+    timings=None,
+    lean=False):
+    with phase(timings, "model_load"):
+        nlp = load_spacy_model(pipes=required_pipes(focus, options))
+    docs = parse_corpus(nlp, texts, cache, batch_size, n_process)
+    # Documents are parsed in batches as the generator is consumed.
+    for doc in iter_phase(timings, "parse", docs):
+        if timings is not None:
+            timings.count(documents=1)
+        analyzer = Analyzer(doc.text, focus, doc=doc, timings=timings, lean=lean, options=options)
+        analyzer.plug_modules(focus, options)
+        analyzer.generate_analysis()
+        yield analyzer
+
+
+def plug_aggregators(focus, options=None) -> dict:
+    # Module instances without an analyzer, enough to merge and finalize.
+    options = options or {}
+    return {f: MODULE_MAP[f](None, **options.get(f, {})) for f in focus if f in MODULE_MAP}
+
+
+def merge_partials(modules, partials, merged=None, timings=None) -> dict:
+    merged = merged if merged is not None else {}
+    for name, partial in partials.items():
+        with phase(timings, f"module.{name}"):
+            if name in merged:
+                merged[name] = modules[name].merge(merged[name], partial)
+            else:
+                # Merges update their first argument in place.
+                merged[name] = copy.deepcopy(partial)
+    return merged
+
+
+def finalize_partials(modules, partials, timings=None) -> dict:
+    analysis = {}
+    for name, partial in partials.items():
+        with phase(timings, f"module.{name}"):
+            analysis[name] = modules[name].finalize(partial)
+    return analysis
+
+
+def stream_partials(chunks, focus, cache=None, options=None, timings=None) -> dict:
+    modules = plug_aggregators(focus, options)
+    partials = {}
+    for chunk in chunks:
+        analyzer = Analyzer(chunk, focus, cache=cache, timings=timings, options=options)
+        analyzer.plug_modules(focus, options)
+        chunk_partials = analyzer.run_modules("partial")
+        for name, partial in chunk_partials.items():
+            if name in partials:
+                with phase(timings, f"module.{name}"):
+                    partial = modules[name].merge(partials[name], partial)
+            partials[name] = partial
+    return partials
+
+
+def analyze_stream(chunks, focus, cache=None, options=None, timings=None):
+    partials = stream_partials(chunks, focus, cache, options, timings)
+    return finalize_partials(plug_aggregators(focus, options), partials, timings)
+
+
+def sample_partials(
+    units,
+    focus,
+    batch_size=PIPE_BATCH_SIZE,
+    n_process=PIPE_N_PROCESS,
+    cache=None,
+    options=None,
+    timings=None):
+    with phase(timings, "model_load"):
+        nlp = load_spacy_model(pipes=required_pipes(focus, options))
+    docs = parse_corpus(nlp, units, cache, batch_size, n_process)
+    for doc in iter_phase(timings, "parse", docs):
+        analyzer = Analyzer(doc.text, focus, doc=doc, timings=timings, options=options)
+        analyzer.plug_modules(focus, options)
+        # Units are short: a thread pool per unit would cost more than it saves.
+        yield analyzer.run_modules("partial", max_workers=1)
+
+
+def analyze_sample(
+    texts,
+    focus,
+    fraction,
+    unit=SAMPLE_UNIT,
+    seed=None,
+    bootstrap=SAMPLE_BOOTSTRAP,
+    confidence=SAMPLE_CONFIDENCE,
+    batch_size=PIPE_BATCH_SIZE,
+    n_process=PIPE_N_PROCESS,
+    cache=None,
+    options=None,
+    timings=None):
+    from utils.sampling import sample_units, SampleEstimator
+    # Only the sampled units are parsed; totals are extrapolated to all units.
+    with phase(timings, "sample"):
+        units, strata, sizes, paragraphs = sample_units(texts, fraction, unit, seed)
+    partials = list(sample_partials(units, focus, batch_size, n_process, cache, options, timings))
+    with phase(timings, "estimate"):
+        estimator = SampleEstimator(
+            plug_aggregators(focus, options),
+            partials,
+            strata,
+            sizes,
+            seed,
+            known={("text", "paragraphs"): paragraphs}
+        )
+        analysis = estimator.estimate(bootstrap, confidence)
+    analysis["sample"].update({"unit": unit, "fraction": fraction, "seed": seed})
+    return analysis
+
+
+def index_partials(
+    files,
+    focus,
+    index,
+    batch_size=PIPE_BATCH_SIZE,
+    n_process=PIPE_N_PROCESS,
+    cache=None,
+    options=None,
+    timings=None,
+    chunk_size=None):
+    # Only new or changed files are loaded and parsed; the aggregates of the
+    # others come from the index.
+    stale = [f for f in files if index.get(f, focus) is None]
+    if timings is not None:
+        timings.count(documents=len(stale))
+    if stale and chunk_size:
+        for f in stale:
+            chunks = iter_chunks(iter_phase(timings, "load_files", iter_file(f)), chunk_size)
+            index.put(f, stream_partials(chunks, focus, cache, options, timings))
+    elif stale:
+        with phase(timings, "model_load"):
+            nlp = load_spacy_model(pipes=required_pipes(focus, options))
+        loaded = iter_phase(timings, "load_files", iter_files(stale))
+        docs = parse_corpus(nlp, (text for _, text in loaded), cache, batch_size, n_process)
+        for f, doc in zip(stale, iter_phase(timings, "parse", docs)):
+            analyzer = Analyzer(doc.text, focus, doc=doc, timings=timings, options=options)
+            analyzer.plug_modules(focus, options)
+            index.put(f, analyzer.run_modules("partial"))
+    index.save()
+    return [(f, index.get(f, focus)) for f in files]
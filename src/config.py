@@ -1,18 +1,107 @@
-from modules.text import TextModule
-from modules.words import WordsModule
-from modules.pos import POSModule
-from modules.readability import ReadabilityModule
-from modules.sentiment import SentimentModule
-
-
-MODULE_MAP = {
-    "text": TextModule,
-    "words": WordsModule,
-    "pos": POSModule,
-    "read": ReadabilityModule,
-    "sent": SentimentModule
+import os
+from utils.lazy import LazyImportMap
+
+
+# Module classes are imported on first lookup, so that a run only pays for
+# the libraries of the modules it uses.
+MODULE_MAP = LazyImportMap({
+    "text": "modules.text.TextModule",
+    "words": "modules.words.WordsModule",
+    "pos": "modules.pos.POSModule",
+    "read": "modules.readability.ReadabilityModule",
+    "sent": "modules.sentiment.SentimentModule",
+    "ngrams": "modules.ngrams.NgramsModule"
+})
+
+SPACY_MODEL = "en_core_web_sm"
+
+SPACY_PIPES = (
+    "tok2vec",
+    "tagger",
+    "parser",
+    "senter",
+    "attribute_ruler",
+    "lemmatizer",
+    "ner"
+)
+
+PIPE_DEPENDENCIES = {
+    "tagger": ("tok2vec",),
+    "parser": ("tok2vec",),
+    "attribute_ruler": ("tagger",),
+    "lemmatizer": ("attribute_ruler",)
 }
 
+PIPE_BATCH_SIZE = 32
+
+PIPE_N_PROCESS = 1
+
+CHUNK_SIZE = 100_000
+
+MODULE_WORKERS = 4
+
+CACHE_DIR = ".climt_cache"
+
+CACHE_MAX_SIZE = 1024 * 1024 * 1024
+
+CACHE_EVICT_TO = 0.9
+
+INDEX_FILE = ".climt_index.json"
+
+TFIDF_TOP_N = 10
+
+NEAR_DUPLICATE_THRESHOLD = 0.9
+
+MINHASH_PERMUTATIONS = 128
+
+SHINGLE_SIZE = 5
+
+SAMPLE_UNIT = "paragraph"
+
+SAMPLE_UNITS = ("paragraph", "sentence")
+
+SAMPLE_STRATUM_SIZE = 1000
+
+SAMPLE_BOOTSTRAP = 200
+
+SAMPLE_CONFIDENCE = 0.95
+
+SENTIMENT_BACKEND = "lexicon"
+
+SENTIMENT_BACKENDS = ("lexicon", "textblob")
+
+READABILITY_BACKEND = "native"
+
+READABILITY_BACKENDS = ("native", "textstat")
+
+SYLLABLE_CACHE_SIZE = 65536
+
 REPORT_DIR = "output"
 
-SUPPORTED_EXTENSIONS = {".txt", ".docx", ".pdf"}
\ No newline at end of file
+REPORT_FLUSH_EVERY = 100
+
+PLOT_WORKERS = os.cpu_count() or 1
+
+PLOT_TOP_N = 20
+
+PROFILE_MODE = "cprofile"
+
+PROFILE_MODES = ("cprofile", "sample")
+
+PROFILE_INTERVAL = 0.005
+
+SERVE_HOST = "127.0.0.1"
+
+SERVE_PORT = 8765
+
+SERVE_BATCH_SIZE = 32
+
+SERVE_BATCH_WAIT = 0.005
+
+SUPPORTED_EXTENSIONS = {".txt", ".docx", ".pdf"}
+
+LOAD_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+LOAD_PREFETCH = 16
+
+LOAD_BLOCK_SIZE = 64 * 1024
\ No newline at end of file
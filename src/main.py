@@ -1,14 +1,319 @@
 # main.py
 
 import argparse
+import os
 import pprint
-from pathlib import Path
-from analyzer import Analyzer
-from utils.report import save_report
-from utils.load import load_files
+import sys
+from collections import deque
+from config import (
+    PIPE_BATCH_SIZE,
+    PIPE_N_PROCESS,
+    CHUNK_SIZE,
+    CACHE_DIR,
+    CACHE_MAX_SIZE,
+    SENTIMENT_BACKEND,
+    SENTIMENT_BACKENDS,
+    READABILITY_BACKEND,
+    READABILITY_BACKENDS,
+    REPORT_DIR,
+    LOAD_WORKERS,
+    PLOT_WORKERS,
+    SPACY_MODEL,
+    SAMPLE_UNIT,
+    SAMPLE_UNITS,
+    SAMPLE_BOOTSTRAP,
+    SAMPLE_CONFIDENCE,
+    INDEX_FILE,
+    TFIDF_TOP_N,
+    NEAR_DUPLICATE_THRESHOLD,
+    PROFILE_MODE,
+    PROFILE_MODES,
+    PROFILE_INTERVAL
+)
+from utils.report import ReportWriter, REPORT_GENERATORS
+from utils.load import iter_files, stream_files, collect_files
+from utils.chunk import iter_chunks, join_texts
+from utils.timings import Timings, phase, iter_phase
+
+
+# spaCy and the document cache are imported where they are first needed, so
+# that --help and argument errors return without loading them.
+
+def module_options(args) -> dict:
+    options = {
+        "read": {"backend": args.readability_backend},
+        "sent": {"backend": args.sentiment_backend}
+    }
+    if args.word_sketch:
+        options["words"] = {"sketch_size": args.word_sketch}
+    if "ngrams" in args.analyze:
+        options["ngrams"] = {
+            "n": args.ngram_size,
+            "rank": args.ngram_rank,
+            "preprocessed": args.ngram_preprocessed
+        }
+    return options
+
+
+def analyze_text(text, args, cache=None, timings=None) -> dict:
+    with phase(timings, "import"):
+        from analyzer import Analyzer, analyze_stream, analyze_sample
+    options = module_options(args)
+    if timings is not None:
+        timings.count(documents=1)
+    if args.sample:
+        return analyze_sample(
+            [text],
+            args.analyze,
+            args.sample,
+            unit=args.sample_unit,
+            seed=args.seed,
+            bootstrap=args.bootstrap,
+            confidence=args.confidence,
+            batch_size=args.batch_size,
+            n_process=args.n_process,
+            cache=cache,
+            options=options,
+            timings=timings
+        )
+    if args.stream:
+        chunks = iter_chunks(text, args.chunk_size)
+        return analyze_stream(chunks, args.analyze, cache, options, timings)
+    analyzer = Analyzer(text, args.analyze, cache=cache, timings=timings, lean=args.lean, options=options)
+    analyzer.plug_modules(args.analyze, options)
+    return analyzer.generate_analysis()
+
+
+def discovery_options(args) -> dict:
+    max_depth = args.max_depth
+    if max_depth is None:
+        max_depth = None if args.recursive else 0
+    return {
+        "include": args.include,
+        "exclude": args.exclude,
+        "max_depth": max_depth,
+        "min_size": args.min_size,
+        "max_size": args.max_size,
+        "dedupe": args.dedupe
+    }
+
+
+def index_signature(args) -> dict:
+    from importlib.metadata import version, PackageNotFoundError
+    versions = {}
+    for package in ("spacy", SPACY_MODEL):
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return {"versions": versions, "options": module_options(args)}
+
+
+def analyze_indexed(args, cache=None, timings=None):
+    with phase(timings, "import"):
+        from analyzer import (
+            index_partials,
+            plug_aggregators,
+            merge_partials,
+            finalize_partials,
+            stream_partials
+        )
+        from utils.index import CorpusIndex
+    files = collect_files(args.files, **discovery_options(args))
+    index = CorpusIndex(args.index, index_signature(args))
+    indexed = index_partials(
+        files,
+        args.analyze,
+        index,
+        batch_size=args.batch_size,
+        n_process=args.n_process,
+        cache=cache,
+        options=module_options(args),
+        timings=timings,
+        chunk_size=args.chunk_size if args.stream else None
+    )
+    modules = plug_aggregators(args.analyze, module_options(args))
+    if args.multi_mode == "separate":
+        for f, partials in indexed:
+            yield str(f), finalize_partials(modules, partials, timings)
+        return
+    # The separator that joins the files in merge mode is aggregated too, so
+    # that the totals match those of the joined text.
+    separator = stream_partials(join_texts(["", ""]), args.analyze, options=module_options(args))
+    merged = {}
+    for i, (_, partials) in enumerate(indexed):
+        if i:
+            merge_partials(modules, separator, merged, timings)
+        merge_partials(modules, partials, merged, timings)
+    yield None, finalize_partials(modules, merged, timings)
+
+
+def skip_duplicates(loaded, threshold, duplicates, timings=None):
+    # Only the first file of a group of near duplicates is analyzed; the
+    # others are set aside with the number of files analyzed before them.
+    from utils.dedupe import NearDuplicates
+    detector = NearDuplicates(threshold)
+    kept = 0
+    for f, text in loaded:
+        with phase(timings, "near_duplicates"):
+            match = detector.add(str(f), text)
+        if match is None:
+            kept += 1
+            yield f, text
+        else:
+            duplicates.append((kept, str(f), {"duplicate": match}))
+
+
+def insert_duplicates(records, duplicates):
+    # Each duplicate is reported in its input position, after the report of
+    # the file it points to.
+    for i, record in enumerate(records):
+        while duplicates and duplicates[0][0] <= i:
+            yield duplicates.popleft()[1:]
+        yield record
+    while duplicates:
+        yield duplicates.popleft()[1:]
+
+
+def load_inputs(args, duplicates, timings=None):
+    loaded = iter_phase(
+        timings,
+        "load_files",
+        iter_files(args.files, max_workers=args.load_workers, **discovery_options(args))
+    )
+    if args.near_duplicates:
+        loaded = skip_duplicates(loaded, args.near_duplicates, duplicates, timings)
+    return loaded
+
+
+def analyze_files(args, cache=None, timings=None):
+    duplicates = deque()
+    records = analyze_documents(args, duplicates, cache, timings)
+    yield from insert_duplicates(records, duplicates)
+
+
+def analyze_documents(args, duplicates, cache=None, timings=None):
+    if args.multi_mode == "merge":
+        if args.stream:
+            # Files are read block by block as the chunks are analyzed.
+            texts = (
+                iter_phase(timings, "load_files", blocks)
+                for _, blocks in stream_files(args.files, **discovery_options(args))
+            )
+            text = join_texts(texts)
+        else:
+            texts = (text for _, text in load_inputs(args, duplicates, timings))
+            text = "".join(join_texts(texts))
+        yield None, analyze_text(text, args, cache, timings)
+    elif args.stream:
+        for f, blocks in stream_files(args.files, **discovery_options(args)):
+            yield str(f), analyze_text(iter_phase(timings, "load_files", blocks), args, cache, timings)
+    else:
+        # Files are loaded in the background and analyzed as they arrive.
+        loaded = load_inputs(args, duplicates, timings)
+        if args.sample:
+            for f, text in loaded:
+                yield str(f), analyze_text(text, args, cache, timings)
+            return
+        with phase(timings, "import"):
+            from analyzer import analyze_corpus
+            if args.tfidf:
+                from modules.tfidf import TfidfModule
+        names = []
+
+        def texts():
+            for f, text in loaded:
+                names.append(str(f))
+                yield text
+
+        analyzers = analyze_corpus(
+            texts(),
+            args.analyze,
+            batch_size=args.batch_size,
+            n_process=args.n_process,
+            cache=cache,
+            options=module_options(args),
+            timings=timings,
+            # The TF-IDF matrix reads the token table once the analysis is done.
+            lean=args.lean and not args.tfidf
+        )
+        if not args.tfidf:
+            for i, analyzer in enumerate(analyzers):
+                yield names[i], analyzer.analysis
+            return
+        # TF-IDF weights need the document frequencies of the whole corpus,
+        # so the reports wait for the last document.
+        tfidf = TfidfModule(args.tfidf)
+        analyses = []
+        for analyzer in analyzers:
+            with phase(timings, "module.tfidf"):
+                tfidf.add(analyzer)
+            if args.lean:
+                analyzer.release()
+            analyses.append(analyzer.analysis)
+        with phase(timings, "module.tfidf"):
+            documents, corpus = tfidf.finalize()
+        for name, analysis, terms in zip(names, analyses, documents):
+            analysis["tfidf"] = terms
+            yield name, analysis
+        yield "corpus", {"tfidf": corpus}
+
+
+def plot_records(records, args, timings=None):
+    from utils.visualization import PlotWriter
+    workers = args.plot_workers if args.multi_mode == "separate" else 1
+    with PlotWriter(args.outfile or "report", workers) as plots:
+        for document, analysis in records:
+            with phase(timings, "plots"):
+                plots.write(analysis, document)
+            yield document, analysis
+    print(f"{len(plots.files)} charts saved to {REPORT_DIR}", file=sys.stderr)
+
+
+def profile_records(records, profiler):
+    # A document's profile is closed when the next one is asked for, so that
+    # it includes writing its report.
+    for document, analysis in records:
+        yield document, analysis
+        profiler.flush(document)
+
+
+def write_reports(records, args, timings=None):
+    # Each report is written, or printed, as soon as its analysis is done.
+    if args.plots:
+        records = plot_records(records, args, timings)
+    if args.output == "stream":
+        for document, analysis in records:
+            if document:
+                print(f"# {document}")
+            pprint.pprint(analysis)
+        return
+    with ReportWriter(args.outfile, args.output) as writer:
+        for document, analysis in records:
+            with phase(timings, "report"):
+                writer.write(analysis, document)
+
+
+def report_timings(timings, args):
+    if args.timings == "json":
+        os.makedirs(REPORT_DIR, exist_ok=True)
+        name = f"{args.outfile}.timings.json" if args.outfile else "timings.json"
+        path = os.path.join(REPORT_DIR, name)
+        timings.save(path)
+        print(f"Timings saved to {path}", file=sys.stderr)
+    else:
+        print(timings.format_table(), file=sys.stderr)
+
+
+def save_profile(profiler, args):
+    paths = profiler.save(args.outfile or "profile")
+    print(f"Profile saved to {', '.join(paths)}", file=sys.stderr)
 
 
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        from server import main as serve
+        return serve(sys.argv[2:])
     parser = argparse.ArgumentParser(
         description="Analyze a text and generate reports in various formats."
     )
@@ -22,6 +327,51 @@ def main():
         nargs="+",
         help="Path(s) to one or more input documents"
     )
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="Look for documents in subdirectories of the given directories too"
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        help="How many levels of subdirectories to look into (implies --recursive)"
+    )
+    parser.add_argument(
+        "--include",
+        nargs="+",
+        metavar="PATTERN",
+        help="Only analyze files whose name or relative path matches one of these glob patterns"
+    )
+    parser.add_argument(
+        "--exclude",
+        nargs="+",
+        metavar="PATTERN",
+        help="Skip files and directories whose name or relative path matches one of these glob patterns"
+    )
+    parser.add_argument(
+        "--min-size",
+        type=int,
+        help="Skip files smaller than this many bytes"
+    )
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        help="Skip files larger than this many bytes"
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Analyze only the first of several files with identical content"
+    )
+    parser.add_argument(
+        "--near-duplicates",
+        nargs="?",
+        type=float,
+        const=NEAR_DUPLICATE_THRESHOLD,
+        metavar="THRESHOLD",
+        help="Analyze only one file of each group whose estimated Jaccard similarity is at least THRESHOLD; the others point to it"
+    )
     parser.add_argument(
         "--multi-mode",
         choices=["merge", "separate"],
@@ -30,11 +380,7 @@ def main():
     )
     parser.add_argument(
         "--output", 
-        choices=[
-            "stream",
-            "txt",
-            "md",
-        ], 
+        choices=["stream", *REPORT_GENERATORS], 
         default="stream", 
         help="Output format"
     )
@@ -50,49 +396,246 @@ def main():
             "words",
             "pos",
             "read",
-            "sent"
+            "sent",
+            "ngrams"
         ], 
         default=["text"], 
         help="Focus of the analysis"
     )
+    parser.add_argument(
+        "--ngram-size",
+        type=int,
+        choices=[2, 3],
+        default=2,
+        help="Length of the n-grams counted by the 'ngrams' analysis"
+    )
+    parser.add_argument(
+        "--ngram-rank",
+        choices=["count", "pmi", "llr"],
+        default="llr",
+        help="How the 'ngrams' analysis ranks collocations"
+    )
+    parser.add_argument(
+        "--ngram-preprocessed",
+        action="store_true",
+        help="Build n-grams from lemmas with stopwords removed"
+    )
+    parser.add_argument(
+        "--plots",
+        action="store_true",
+        help="Save bar charts of the word and POS frequencies of every report as PNG files"
+    )
+    parser.add_argument(
+        "--plot-workers",
+        type=int,
+        default=PLOT_WORKERS,
+        help="Number of processes drawing charts in 'separate' mode"
+    )
+    parser.add_argument(
+        "--readability-backend",
+        choices=READABILITY_BACKENDS,
+        default=READABILITY_BACKEND,
+        help="Engine used by the 'read' analysis"
+    )
+    parser.add_argument(
+        "--sentiment-backend",
+        choices=SENTIMENT_BACKENDS,
+        default=SENTIMENT_BACKEND,
+        help="Engine used by the 'sent' analysis"
+    )
+    parser.add_argument(
+        "--word-sketch",
+        type=int,
+        metavar="SIZE",
+        help="Keep at most SIZE word counts when merging chunks or files; the top words are then approximate and reported with an error bound"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=PIPE_BATCH_SIZE,
+        help="Number of documents parsed per batch in 'separate' mode"
+    )
+    parser.add_argument(
+        "--n-process",
+        type=int,
+        default=PIPE_N_PROCESS,
+        help="Number of worker processes used to parse documents in 'separate' mode"
+    )
+    parser.add_argument(
+        "--tfidf",
+        nargs="?",
+        type=int,
+        const=TFIDF_TOP_N,
+        metavar="TOP_N",
+        help="In 'separate' mode, add each document's most distinctive terms by TF-IDF and a corpus record of document frequencies"
+    )
+    parser.add_argument(
+        "--sample",
+        type=float,
+        metavar="FRACTION",
+        help="Parse only this fraction of the paragraphs or sentences and estimate the analysis, with bootstrap confidence intervals"
+    )
+    parser.add_argument(
+        "--sample-unit",
+        choices=SAMPLE_UNITS,
+        default=SAMPLE_UNIT,
+        help="What --sample draws: paragraphs or sentences"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Random seed of --sample, for reproducible estimates"
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=SAMPLE_BOOTSTRAP,
+        help="Number of bootstrap replicates behind the --sample confidence intervals"
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=SAMPLE_CONFIDENCE,
+        help="Confidence level of the --sample intervals"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse the input in bounded chunks instead of one document"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        help="Maximum number of characters per chunk in --stream mode"
+    )
+    parser.add_argument(
+        "--lean",
+        action="store_true",
+        help="Release each document's parse and intermediate inputs as soon as the modules using them are done"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse parsed documents from an on-disk cache"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=CACHE_DIR,
+        help="Directory of the parsed document cache"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=CACHE_MAX_SIZE // (1024 * 1024),
+        help="Maximum size of the parsed document cache in MB"
+    )
+    parser.add_argument(
+        "--index",
+        nargs="?",
+        const=INDEX_FILE,
+        help="Keep per-file aggregates in a corpus index and only analyze new or changed files"
+    )
+    parser.add_argument(
+        "--load-workers",
+        type=int,
+        default=LOAD_WORKERS,
+        help="Number of threads (and PDF worker processes) used to load input files"
+    )
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="table",
+        choices=["table", "json"],
+        help="Record time and memory per phase and print them as a table or save them as JSON"
+    )
+    parser.add_argument(
+        "--timings-memory",
+        action="store_true",
+        help="Also trace the peak Python memory of each phase with tracemalloc, which slows the run down"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=PROFILE_MODE,
+        choices=PROFILE_MODES,
+        help="Profile the run with cProfile or a sampling thread and save .pstats and collapsed stacks"
+    )
+    parser.add_argument(
+        "--profile-interval",
+        type=float,
+        default=PROFILE_INTERVAL,
+        help="Seconds between the stack samples of --profile sample"
+    )
+    parser.add_argument(
+        "--profile-per-file",
+        action="store_true",
+        help="Also save one profile per input file with --multi-mode separate"
+    )
 
 
     args = parser.parse_args()
-
-    if args.files:
-        texts = load_files(args.files)
-        if args.multi_mode == "merge":
-            text = "\n\n".join(texts)
-            analyzer = Analyzer(text)
-            analyzer.plug_modules(args.analyze)
-            analyzer.generate_analysis()
-            analysis = analyzer.analysis
-            save_report(analysis, args.outfile, args.output)
-        else:
-            for filepath, text in zip(args.files, texts):
-                analyzer = Analyzer(text)
-                analyzer.plug_modules(args.analyze)
-                analyzer.generate_analysis()
-                analysis = analyzer.analysis
-                base = Path(filepath).stem
-                save_report(analysis, f"{base}_{args.outfile}", args.output)
-    elif args.input:
-        text = args.input
-        analyzer = Analyzer(text)
-        analyzer.plug_modules(args.analyze)
-        analyzer.generate_analysis()
-        analysis = analyzer.analysis
-        save_report(analysis, args.outfile, args.output)
+    if args.output != "stream" and not args.outfile:
+        parser.error(f"--outfile is required for .{args.output} output")
+    if not args.files and not args.input:
+        parser.error("No input text or file provided.")
+    if args.tfidf is not None and (args.multi_mode != "separate" or not args.files):
+        parser.error("--tfidf compares documents and needs --files with --multi-mode separate")
+    if args.tfidf is not None and (args.stream or args.index):
+        parser.error("--tfidf cannot be combined with --stream or --index")
+    if args.tfidf is not None and args.tfidf < 1:
+        parser.error("--tfidf must be at least 1")
+    if args.near_duplicates is not None and not 0 < args.near_duplicates <= 1:
+        parser.error("--near-duplicates must be between 0 and 1")
+    if args.near_duplicates is not None and (args.stream or args.index):
+        parser.error("--near-duplicates cannot be combined with --stream or --index")
+    if args.sample is not None:
+        if not 0 < args.sample <= 1:
+            parser.error("--sample must be between 0 and 1")
+        if not 0 < args.confidence < 1:
+            parser.error("--confidence must be between 0 and 1")
+        if args.stream or args.index or args.tfidf:
+            parser.error("--sample cannot be combined with --stream, --index or --tfidf")
+        if "ngrams" in args.analyze:
+            parser.error("--sample does not estimate the 'ngrams' analysis")
+    if args.word_sketch is not None and args.word_sketch < 1:
+        parser.error("--word-sketch must be at least 1")
+    if args.timings_memory and not args.timings:
+        parser.error("--timings-memory needs --timings")
+    if args.profile_interval <= 0:
+        parser.error("--profile-interval must be positive")
+    if args.profile_per_file and (not args.profile or not args.files or args.multi_mode != "separate"):
+        parser.error("--profile-per-file needs --profile and --files with --multi-mode separate")
+    profiler = None
+    if args.profile:
+        # The profiler records phase timings as well, and tags profiled
+        # frames with the phase they ran in.
+        from utils.profiling import Profiler
+        profiler = Profiler(args.profile, args.profile_interval, args.profile_per_file)
+        profiler.start()
+        timings = profiler
     else:
-        raise Exception("No input text or file provided.")
+        timings = Timings(trace_memory=args.timings_memory) if args.timings else None
+    cache = None
+    if args.cache:
+        from utils.cache import DocCache
+        cache = DocCache(args.cache_dir, args.cache_size * 1024 * 1024)
 
-    if args.output == "stream":
-        pprint.pprint(analysis)
+    if args.files and args.index:
+        records = analyze_indexed(args, cache, timings)
+    elif args.files:
+        records = analyze_files(args, cache, timings)
     else:
-        if not args.outfile:
-            print(f"Filename required for .{args.output} output")
-        else:
-            save_report(analysis, args.outfile, args.output)
-    
+        records = [(None, analyze_text(args.input, args, cache, timings))]
+    if args.profile_per_file:
+        records = profile_records(records, profiler)
+    write_reports(records, args, timings)
+
+    if profiler is not None:
+        profiler.stop()
+        save_profile(profiler, args)
+    if args.timings:
+        report_timings(timings, args)
+
 if __name__ == "__main__":
     main()
@@ -3,12 +3,32 @@
 
 class AnalysisModule():
 
+    __slots__ = ("name", "analyzer")
+
+    pipes = ()
+
+    inputs = ()
+
     def __init__(self, analyzer, name=None):
         self.name = name
         self.analyzer = analyzer
+
+    @classmethod
+    def required_pipes(cls, **options) -> tuple:
+        # The pipeline components needed with these module options.
+        return cls.pipes
     
     def plug(self):
         self.analyzer.modules.append(self)
 
     def analyze(self):
-        pass
\ No newline at end of file
+        return self.finalize(self.partial())
+
+    def partial(self):
+        pass
+
+    def merge(self, partial, other):
+        pass
+
+    def finalize(self, partial):
+        pass
@@ -0,0 +1,209 @@
+# src/modules/ngrams.py
+
+from collections import Counter
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from modules.analysis import AnalysisModule
+
+
+RANKINGS = ("count", "pmi", "llr")
+
+SENTENCE_END = ".!?"
+
+
+def pack(codes, base: int):
+    # Rows of word codes as single integers, exact while base ** n fits.
+    if base ** codes.shape[1] >= 2 ** 63:
+        raise ValueError("Too many distinct words to pack these n-grams")
+    weights = base ** np.arange(codes.shape[1] - 1, -1, -1, dtype=np.int64)
+    return codes @ weights
+
+
+def segments(tokens):
+    # Segment number of each token: a new segment starts after each line
+    # break and each sentence-final punctuation mark. Chunks of a stream end
+    # at such a token whenever one is close enough, and texts are joined by
+    # blank lines, so n-grams do not depend on chunking and never span two
+    # documents.
+    candidates = np.unique(tokens.orth[~tokens.alpha])
+    boundaries = [
+        value for value, text in zip(candidates, tokens.decode(candidates))
+        if "\n" in text or (text and not text.strip(SENTENCE_END))
+    ]
+    return np.cumsum(np.isin(tokens.orth, boundaries))
+
+
+def count_windows(codes, n: int, base: int, segment):
+    # Windows whose first and last words are in the same segment.
+    windows = sliding_window_view(codes, n)
+    positions = np.flatnonzero(segment[:len(windows)] == segment[n - 1:])
+    keys, first, counts = np.unique(pack(windows[positions], base), return_index=True, return_counts=True)
+    return windows[positions[first]], keys, counts, positions[first]
+
+
+def xlogx(k, expected):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(k > 0, k * np.log(k / expected), 0.0)
+
+
+def score(counts, word_counts, prefix_counts, last_counts, total):
+    # PMI over every word of the n-gram, and Dunning's log-likelihood ratio
+    # of its first n - 1 words against its last one.
+    counts = counts.astype(np.float64)
+    n = word_counts.shape[1]
+    pmi = np.log2(counts * float(total) ** (n - 1) / np.prod(word_counts.astype(np.float64), axis=1))
+    k11 = counts
+    k12 = np.maximum(prefix_counts - counts, 0)
+    k21 = np.maximum(last_counts - counts, 0)
+    k22 = np.maximum(total - prefix_counts - last_counts + counts, 0)
+    rows = (k11 + k12, k21 + k22)
+    cols = (k11 + k21, k12 + k22)
+    llr = 2 * (
+        xlogx(k11, rows[0] * cols[0] / total)
+        + xlogx(k12, rows[0] * cols[1] / total)
+        + xlogx(k21, rows[1] * cols[0] / total)
+        + xlogx(k22, rows[1] * cols[1] / total)
+    )
+    return pmi, llr
+
+
+class NgramsModule(AnalysisModule):
+
+    __slots__ = ("n", "top_n", "rank", "min_count", "preprocessed")
+
+    inputs = ("tokens",)
+
+    def __init__(
+        self,
+        analyzer,
+        n=2,
+        top_n=20,
+        rank="llr",
+        min_count=2,
+        preprocessed=False
+        ):
+        super().__init__(analyzer, "ngrams")
+        if n not in (2, 3):
+            raise ValueError("Only bigrams and trigrams are supported")
+        if rank not in RANKINGS:
+            raise ValueError(f"Unsupported n-gram ranking: {rank}")
+        self.n = n
+        self.top_n = top_n
+        self.rank = rank
+        self.min_count = min_count
+        self.preprocessed = preprocessed
+
+    @classmethod
+    def required_pipes(cls, preprocessed=False, **options) -> tuple:
+        return cls.pipes + (("lemmatizer",) if preprocessed else ())
+
+    def sequence(self, tokens):
+        # Token IDs of the words n-grams are made of: the lowercase forms, or
+        # the lemmas without stopwords, as in Analyzer.preprocessed_words;
+        # with the segment of each.
+        if not self.preprocessed:
+            mask = tokens.alpha
+            values = tokens.lower
+        else:
+            mask = tokens.alpha & ~tokens.is_stop.astype(bool)
+            values = np.where(tokens.lemma != 0, tokens.lemma, tokens.lower)
+        return values[mask], segments(tokens)[mask]
+
+    def count(self) -> dict:
+        tokens = self.analyzer.get_input("tokens")
+        sequence, segment = self.sequence(tokens)
+        vocab, codes = np.unique(sequence, return_inverse=True)
+        counted = {
+            "tokens": tokens,
+            "vocab": vocab,
+            "unigrams": np.bincount(codes, minlength=len(vocab)),
+            "total": len(codes)
+        }
+        if len(codes) < self.n:
+            return counted
+        base = max(len(vocab), 1)
+        grams, _, counts, first = count_windows(codes, self.n, base, segment)
+        if not len(grams):
+            return counted
+        prefix_grams, prefix_keys, prefix_counts, _ = count_windows(codes, self.n - 1, base, segment)
+        counted.update({
+            "grams": grams,
+            "counts": counts,
+            "first": first,
+            "prefixes": prefix_counts[np.searchsorted(prefix_keys, pack(grams[:, :-1], base))],
+            "prefix_grams": prefix_grams,
+            "prefix_counts": prefix_counts
+        })
+        return counted
+
+    def top(self, counts, word_counts, prefixes, total, order):
+        # The n-grams seen at least min_count times, by decreasing rank; ties
+        # go to the more frequent, then to the first seen.
+        pmi, llr = score(counts, word_counts, prefixes, word_counts[:, -1], total)
+        key = {"count": counts, "pmi": pmi, "llr": llr}[self.rank]
+        kept = np.flatnonzero(counts >= self.min_count)
+        ranked = np.lexsort((order[kept], -counts[kept], -key[kept]))[:self.top_n]
+        return kept[ranked], pmi, llr
+
+    def analyze(self) -> dict:
+        # Only the reported n-grams are decoded.
+        counted = self.count()
+        if "grams" not in counted:
+            return {}
+        grams, counts = counted["grams"], counted["counts"]
+        word_counts = counted["unigrams"][grams]
+        top, pmi, llr = self.top(counts, word_counts, counted["prefixes"], counted["total"], counted["first"])
+        words = counted["tokens"].decode(counted["vocab"][grams[top]].ravel())
+        names = [" ".join(words[i:i + self.n]).lower() for i in range(0, len(words), self.n)]
+        return self.format_ngrams(names, counts[top], counts.sum(), pmi[top], llr[top])
+
+    def partial(self) -> dict:
+        counted = self.count()
+        words = [word.lower() for word in counted["tokens"].decode(counted["vocab"])]
+        partial = {
+            "ngrams": Counter(),
+            "prefixes": Counter(),
+            "unigrams": Counter(),
+            "total": counted["total"]
+        }
+        for code, count in enumerate(counted["unigrams"].tolist()):
+            partial["unigrams"][words[code]] += count
+        if "grams" not in counted:
+            return partial
+        # In order of first occurrence, as analyze() breaks ties.
+        order = np.argsort(counted["first"], kind="stable")
+        for gram, count in zip(counted["grams"][order].tolist(), counted["counts"][order].tolist()):
+            partial["ngrams"][" ".join(words[code] for code in gram)] += count
+        for gram, count in zip(counted["prefix_grams"].tolist(), counted["prefix_counts"].tolist()):
+            partial["prefixes"][" ".join(words[code] for code in gram)] += count
+        return partial
+
+    def merge(self, partial, other) -> dict:
+        # N-grams stop at line breaks and sentence ends, where chunks end.
+        for key in ("ngrams", "prefixes", "unigrams"):
+            partial[key].update(other[key])
+        partial["total"] += other["total"]
+        return partial
+
+    def finalize(self, partial) -> dict:
+        if not partial["ngrams"]:
+            return {}
+        names = list(partial["ngrams"])
+        counts = np.array([partial["ngrams"][name] for name in names])
+        split = [name.split(" ") for name in names]
+        word_counts = np.array([[partial["unigrams"][word] for word in words] for words in split])
+        prefixes = np.array([partial["prefixes"][" ".join(words[:-1])] for words in split])
+        top, pmi, llr = self.top(counts, word_counts, prefixes, partial["total"], np.arange(len(names)))
+        return self.format_ngrams([names[i] for i in top], counts[top], counts.sum(), pmi[top], llr[top])
+
+    def format_ngrams(self, names, counts, total, pmi, llr) -> dict:
+        total = int(total)
+        return {
+            name: {
+                "count": int(count),
+                "freq": round(count / total * 100, 2),
+                "pmi": round(float(p), 3),
+                "llr": round(float(l), 3)
+            }
+            for name, count, p, l in zip(names, counts.tolist(), pmi.tolist(), llr.tolist())
+        }
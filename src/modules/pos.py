@@ -5,13 +5,25 @@ from modules.analysis import AnalysisModule
 
 
 class POSModule(AnalysisModule):
-    
+
+    __slots__ = ()
+
+    pipes = ("tagger", "attribute_ruler")
+
+    inputs = ("tokens",)
+
     def __init__(self, analyzer):
         super().__init__(analyzer, "pos")
-        self.doc = analyzer.doc
 
-    def analyze(self) -> dict:
-        pos_counts = Counter([token.pos_ for token in self.doc if token.is_alpha])
+    def partial(self) -> Counter:
+        tokens = self.analyzer.get_input("tokens")
+        return Counter(tokens.counts("pos", tokens.alpha))
+
+    def merge(self, partial, other) -> Counter:
+        partial.update(other)
+        return partial
+
+    def finalize(self, pos_counts) -> dict:
         total = sum(pos_counts.values())
         pos_stats = {
             pos: {
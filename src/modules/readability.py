@@ -1,22 +1,162 @@
 # src/modules/readability.py
 
-import textstat
 from modules.analysis import AnalysisModule
+from config import READABILITY_BACKEND
+from utils.syllables import count_syllables, is_complex_word
+
+
+# Gunning fog counts words of this many syllables or more as difficult.
+FOG_SYLLABLE_THRESHOLD = 3
 
 
 class ReadabilityModule(AnalysisModule):
+
+    # Each backend declares its own inputs.
+    __slots__ = ("backend", "inputs")
+
+    pipes = ("parser",)
+
+    backend_inputs = {
+        "native": ("tokens", "sentences"),
+        "textstat": ("text",)
+    }
     
-    def __init__(self, analyzer):
+    def __init__(self, analyzer, backend=READABILITY_BACKEND):
         super().__init__(analyzer, "read")
-        self.text = analyzer.get_text()
+        self.backend = backend
+        self.inputs = self.backend_inputs.get(backend, ())
+
+    @property
+    def text(self) -> str:
+        return self.analyzer.get_input("text")
 
-    def analyze(self) -> dict:
+    def partial(self) -> dict:
+        if self.backend == "native":
+            return self.native_partial()
+        elif self.backend == "textstat":
+            return self.textstat_partial()
+        else:
+            raise ValueError(f"Unsupported readability backend: {self.backend}")
+
+    def native_partial(self) -> dict:
+        # Sentences and words are the ones TextModule counts; each distinct
+        # word is syllabified once and weighted by its number of occurrences.
+        tokens = self.analyzer.get_input("tokens")
+        visible = ~tokens.is_space.astype(bool)
+        counts = {
+            "sentences": len(self.analyzer.get_input("sentences")),
+            "words": int(tokens.alpha.sum()),
+            "tokens": int(visible.sum()),
+            "syllables": 0,
+            "polysyllables": 0,
+            "difficult_words": 0,
+            "letters": 0,
+            "characters": int(tokens.length[visible].sum()),
+        }
+        uniques, _, occurrences = tokens.count("lower", tokens.alpha)
+        for word, n in zip(tokens.decode(uniques), occurrences.tolist()):
+            syllables = count_syllables(word)
+            counts["letters"] += len(word) * n
+            counts["syllables"] += syllables * n
+            counts["polysyllables"] += (syllables >= 3) * n
+            counts["difficult_words"] += is_complex_word(word) * n
+        return counts
+
+    def textstat_partial(self) -> dict:
+        import textstat
+        return {
+            "sentences": textstat.sentence_count(self.text),
+            "words": textstat.lexicon_count(self.text),
+            "tokens": textstat.lexicon_count(self.text, removepunct=False),
+            "syllables": textstat.syllable_count(self.text),
+            "polysyllables": textstat.polysyllabcount(self.text),
+            "difficult_words": textstat.difficult_words(
+                self.text, syllable_threshold=FOG_SYLLABLE_THRESHOLD, unique=False
+            ),
+            "letters": textstat.letter_count(self.text),
+            "characters": textstat.char_count(self.text),
+        }
+
+    def merge(self, partial, other) -> dict:
+        return {key: partial[key] + other[key] for key in partial}
+
+    def finalize(self, partial) -> dict:
         readability_stats = {
-            "flesch_reading_ease": round(textstat.flesch_reading_ease(self.text), 2),
-            "flesch_kincaid_grade": round(textstat.flesch_kincaid_grade(self.text), 2),
-            "gunning_fog": textstat.gunning_fog(self.text),
-            "smog_index": textstat.smog_index(self.text),
-            "automated_readability_index": round(textstat.automated_readability_index(self.text), 2),
-            "coleman_liau_index": round(textstat.coleman_liau_index(self.text), 2),
+            "flesch_reading_ease": round(flesch_reading_ease(partial), 2),
+            "flesch_kincaid_grade": round(flesch_kincaid_grade(partial), 2),
+            "gunning_fog": gunning_fog(partial),
+            "smog_index": smog_index(partial),
+            "automated_readability_index": round(automated_readability_index(partial), 2),
+            "coleman_liau_index": round(coleman_liau_index(partial), 2),
         }
-        return readability_stats
\ No newline at end of file
+        return readability_stats
+
+
+# The formulas below follow textstat's own, operation for operation, so that
+# the textstat backend reports exactly what textstat computes.
+
+def words_per_sentence(counts) -> float:
+    try:
+        return counts["words"] / counts["sentences"]
+    except ZeroDivisionError:
+        return 0.0
+
+
+def syllables_per_word(counts) -> float:
+    try:
+        return counts["syllables"] / counts["words"]
+    except ZeroDivisionError:
+        return 0.0
+
+
+def flesch_reading_ease(counts) -> float:
+    sentence_length = words_per_sentence(counts)
+    syllables = syllables_per_word(counts)
+    if sentence_length == 0 or syllables == 0:
+        return 0.0
+    return 206.835 - 1.015 * sentence_length - 84.6 * syllables
+
+
+def flesch_kincaid_grade(counts) -> float:
+    sentence_length = words_per_sentence(counts)
+    syllables = syllables_per_word(counts)
+    if sentence_length == 0 or syllables == 0:
+        return 0.0
+    return (0.39 * sentence_length) + (11.8 * syllables) - 15.59
+
+
+def gunning_fog(counts) -> float:
+    try:
+        per_diff_words = 100 * counts["difficult_words"] / counts["words"]
+    except ZeroDivisionError:
+        return 0.0
+    return 0.4 * (words_per_sentence(counts) + per_diff_words)
+
+
+def smog_index(counts) -> float:
+    try:
+        return (1.043 * (30 * (counts["polysyllables"] / counts["sentences"])) ** 0.5) + 3.1291
+    except ZeroDivisionError:
+        return 0.0
+
+
+def automated_readability_index(counts) -> float:
+    try:
+        a = counts["characters"] / counts["tokens"]
+    except ZeroDivisionError:
+        a = 0.0
+    b = words_per_sentence(counts)
+    if a == 0 or b == 0:
+        return 0.0
+    return (4.71 * a) + (0.5 * b) - 21.43
+
+
+def coleman_liau_index(counts) -> float:
+    try:
+        letters = counts["letters"] / counts["words"] * 100
+        sentences = counts["sentences"] / counts["words"] * 100
+    except ZeroDivisionError:
+        return 0.0
+    if letters == 0 or sentences == 0:
+        return 0.0
+    return (0.058 * letters) - (0.296 * sentences) - 15.8
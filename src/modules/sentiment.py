@@ -1,30 +1,106 @@
 # src/modules/sentiment.py
 
-from textblob import TextBlob
 from modules.analysis import AnalysisModule
+from config import SENTIMENT_BACKEND
 
 
 class SentimentModule(AnalysisModule):
 
-    def __init__(self, analyzer):
+    # Each backend declares its own inputs.
+    __slots__ = ("backend", "inputs")
+
+    pipes = ("parser",)
+
+    backend_inputs = {
+        "lexicon": ("sents",),
+        "textblob": ("text", "sentences")
+    }
+
+    def __init__(self, analyzer, backend=SENTIMENT_BACKEND):
         super().__init__(analyzer, "sent")
-        self.text = analyzer.get_text()
-        self.sentences = analyzer.get_sentences()
+        self.backend = backend
+        self.inputs = self.backend_inputs.get(backend, ())
 
-    def analyze(self) -> dict:
-        overall = TextBlob(self.text).sentiment
-        sentence_sentiments = {}
-        for i, sentence in enumerate(self.sentences, start=1):
+    @property
+    def text(self) -> str:
+        return self.analyzer.get_input("text")
+
+    @property
+    def sentences(self) -> list:
+        return self.analyzer.get_input("sentences")
+
+    def partial(self) -> dict:
+        if self.backend == "lexicon":
+            return self.lexicon_partial()
+        elif self.backend == "textblob":
+            return self.textblob_partial()
+        else:
+            raise ValueError(f"Unsupported sentiment backend: {self.backend}")
+
+    def lexicon_partial(self) -> dict:
+        # Each sentence is tokenized once, as TextBlob does. The overall score
+        # is the mean over the assessments of the whole text, in which a
+        # modifier or a negation carries over to the next sentence, as in
+        # TextBlob.
+        from utils.lexicon import load_lexicon, tokenize
+        lexicon = load_lexicon()
+        words = []
+        sentence_sentiments = []
+        for sent in self.analyzer.get_input("sents"):
+            sentence = tokenize(sent.text)
+            words.extend(sentence)
+            assessments = lexicon.assess(sentence)
+            n = len(assessments) or 1
+            sentence_sentiments.append((
+                sent.text.strip(),
+                sum(a[0] for a in assessments) / n,
+                sum(a[1] for a in assessments) / n
+            ))
+        assessments = lexicon.assess(words)
+        return {
+            "polarity": sum(a[0] for a in assessments),
+            "subjectivity": sum(a[1] for a in assessments),
+            "assessments": len(assessments),
+            "sentences": sentence_sentiments
+        }
+
+    def textblob_partial(self) -> dict:
+        # TextBlob's overall score is the mean over its assessments, so the
+        # sums and the number of assessments can be merged across chunks.
+        from textblob import TextBlob
+        from textblob.en import sentiment as pattern_sentiment
+        assessments = pattern_sentiment(self.text).assessments
+        sentence_sentiments = []
+        for sentence in self.sentences:
             detail = TextBlob(str(sentence)).sentiment
+            sentence_sentiments.append((str(sentence), detail.polarity, detail.subjectivity))
+        return {
+            "polarity": sum(polarity for _, polarity, _, _ in assessments),
+            "subjectivity": sum(subjectivity for _, _, subjectivity, _ in assessments),
+            "assessments": len(assessments),
+            "sentences": sentence_sentiments
+        }
+
+    def merge(self, partial, other) -> dict:
+        partial["polarity"] += other["polarity"]
+        partial["subjectivity"] += other["subjectivity"]
+        partial["assessments"] += other["assessments"]
+        partial["sentences"].extend(other["sentences"])
+        return partial
+
+    def finalize(self, partial) -> dict:
+        assessments = partial["assessments"] or 1
+        sentence_sentiments = {}
+        for i, (sentence, polarity, subjectivity) in enumerate(partial["sentences"], start=1):
             sentence_sentiments[i] = {
-                "content": str(sentence),
-                "polarity": round(detail.polarity, 3),
-                "subjectivity": round(detail.subjectivity, 3)
+                "content": sentence,
+                "polarity": round(polarity, 3),
+                "subjectivity": round(subjectivity, 3)
             }
         return {
             "overall": {
-                "polarity": round(overall.polarity, 3),
-                "subjectivity": round(overall.subjectivity, 3)
+                "polarity": round(partial["polarity"] / assessments, 3),
+                "subjectivity": round(partial["subjectivity"] / assessments, 3)
             },
             "sentences": sentence_sentiments
         }
@@ -4,14 +4,31 @@ from modules.analysis import AnalysisModule
 
 
 class TextModule(AnalysisModule):
-    
+
+    __slots__ = ()
+
+    pipes = ("parser",)
+
+    inputs = ("text", "sentences", "tokens", "paragraphs")
+
     def __init__(self, analyzer):
         super().__init__(analyzer, "text")
-        self._text = self.analyzer.get_text()
-        self._sentences = self.analyzer.get_sentences()
-        self._words = self.analyzer.get_words()
-        self._paragraphs = self.get_paragraphs()
 
+    @property
+    def _text(self) -> str:
+        return self.analyzer.get_input("text")
+
+    @property
+    def _sentences(self) -> list:
+        return self.analyzer.get_input("sentences")
+
+    @property
+    def _words(self) -> list:
+        return self.analyzer.get_input("words")
+
+    @property
+    def _paragraphs(self) -> list:
+        return self.analyzer.get_input("paragraphs")
 
     def get_character_count(self) -> int:
         return len(self._text)
@@ -23,7 +40,7 @@ class TextModule(AnalysisModule):
         return round(len(self._text) / len(self._words), 2)
 
     def get_paragraphs(self) -> list:
-        return [p for p in self._text.split("\n") if p.strip()]
+        return self._paragraphs
 
     def get_paragraph_count(self) -> int:
         return len(self._paragraphs)
@@ -43,17 +60,50 @@ class TextModule(AnalysisModule):
     def get_unique_word_count(self) -> int:
         return len(set(self._words))
 
-    def analyze(self) -> dict:
+    def partial(self) -> dict:
+        lines = self._text.split("\n")
+        tokens = self.analyzer.get_input("tokens")
+        uniques, _, _ = tokens.count("orth", tokens.alpha)
+        return {
+            "characters": self.get_character_count(),
+            "words": int(tokens.alpha.sum()),
+            "unique_words": set(tokens.decode(uniques)),
+            "sentences": self.get_sentence_count(),
+            "paragraphs": self.get_paragraph_count(),
+            "lines": len(lines),
+            "head": bool(lines[0].strip()),
+            "tail": bool(lines[-1].strip()),
+        }
+
+    def merge(self, partial, other) -> dict:
+        # A line cut by a chunk boundary is counted on both sides.
+        split_paragraph = partial["tail"] and other["head"]
+        partial["unique_words"] |= other["unique_words"]
+        return {
+            "characters": partial["characters"] + other["characters"],
+            "words": partial["words"] + other["words"],
+            "unique_words": partial["unique_words"],
+            "sentences": partial["sentences"] + other["sentences"],
+            "paragraphs": partial["paragraphs"] + other["paragraphs"] - split_paragraph,
+            "lines": partial["lines"] + other["lines"] - 1,
+            "head": partial["head"] if partial["lines"] > 1 else partial["head"] or other["head"],
+            "tail": other["tail"] if other["lines"] > 1 else partial["tail"] or other["tail"],
+        }
+
+    def finalize(self, partial) -> dict:
+        characters = partial["characters"]
+        words = partial["words"]
+        sentences = partial["sentences"]
+        paragraphs = partial["paragraphs"]
         text_stats = {
-            'character_count': self.get_character_count(),
-            'character_per_word': self.get_character_per_word(),
-            'word_count': self.get_word_count(),
-            'paragraph_count': self.get_paragraph_count(),
-            'words_per_paragraph': self.get_word_count_per_paragraph(),
-            'sentences_per_paragraph': self.get_sentence_count_per_paragraph(),
-            'sentence_count': self.get_sentence_count(),
-            'words_per_sentence': self.get_word_count_per_sentence(),
-            'unique_word_count': self.get_unique_word_count(),
+            'character_count': characters,
+            'character_per_word': round(characters / words, 2),
+            'word_count': words,
+            'paragraph_count': paragraphs,
+            'words_per_paragraph': words / paragraphs,
+            'sentences_per_paragraph': sentences / paragraphs,
+            'sentence_count': sentences,
+            'words_per_sentence': words / sentences,
+            'unique_word_count': len(partial["unique_words"]),
         }
         return text_stats
-
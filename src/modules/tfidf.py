@@ -0,0 +1,88 @@
+# src/modules/tfidf.py
+
+import numpy as np
+
+
+class DocumentTermMatrix():
+
+    def __init__(self):
+        # Rows are appended document by document; terms are spaCy string
+        # hashes until build() maps them to column indices.
+        self.terms = []
+        self.counts = []
+        self.indptr = [0]
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def add(self, terms, counts):
+        self.terms.append(np.asarray(terms, dtype=np.uint64))
+        self.counts.append(np.asarray(counts, dtype=np.int64))
+        self.indptr.append(self.indptr[-1] + len(terms))
+
+    def build(self):
+        terms = np.concatenate(self.terms) if self.terms else np.empty(0, dtype=np.uint64)
+        self.data = np.concatenate(self.counts) if self.counts else np.empty(0, dtype=np.int64)
+        self.vocabulary, self.indices = np.unique(terms, return_inverse=True)
+        self.indptr = np.asarray(self.indptr, dtype=np.int64)
+        self.rows = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+        self.terms, self.counts = [], []
+        return self
+
+    def document_frequency(self):
+        return np.bincount(self.indices, minlength=len(self.vocabulary))
+
+    def tfidf(self):
+        # Smoothed idf and L2-normalized rows, as in scikit-learn's defaults.
+        idf = np.log((1 + len(self)) / (1 + self.document_frequency())) + 1
+        scores = self.data * idf[self.indices]
+        norms = np.sqrt(np.bincount(self.rows, weights=scores ** 2, minlength=len(self)))
+        return scores / norms[self.rows]
+
+    def top(self, scores, n: int):
+        # Entries of each row by decreasing score, the first n of every row
+        # kept; returns their positions and the row boundaries among them.
+        order = np.lexsort((self.indices, -scores, self.rows))
+        rank = np.arange(len(order)) - self.indptr[self.rows[order]]
+        kept = order[rank < n]
+        bounds = np.searchsorted(self.rows[kept], np.arange(len(self) + 1))
+        return kept, bounds
+
+
+class TfidfModule():
+
+    inputs = ("tokens",)
+
+    def __init__(self, top_n=10):
+        self.name = "tfidf"
+        self.top_n = top_n
+        self.matrix = DocumentTermMatrix()
+        self.strings = None
+
+    def add(self, analyzer):
+        tokens = analyzer.get_input("tokens")
+        terms, counts = np.unique(tokens.lower[tokens.alpha], return_counts=True)
+        self.matrix.add(terms, counts)
+        self.strings = tokens.strings
+
+    def decode(self, columns) -> list:
+        return [self.strings[int(term)] for term in self.matrix.vocabulary[columns]]
+
+    def finalize(self):
+        matrix = self.matrix.build()
+        scores = matrix.tfidf()
+        kept, bounds = matrix.top(scores, self.top_n)
+        words = self.decode(matrix.indices[kept])
+        values = np.round(scores[kept], 4).tolist()
+        documents = [
+            dict(zip(words[start:end], values[start:end]))
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        df = matrix.document_frequency()
+        common = np.argsort(-df, kind="stable")[:self.top_n]
+        corpus = {
+            "documents": len(matrix),
+            "terms": len(matrix.vocabulary),
+            "document_frequency": dict(zip(self.decode(common), df[common].tolist()))
+        }
+        return documents, corpus
@@ -1,9 +1,9 @@
 # modules/words.py
 
 import math
-import matplotlib.pyplot as plt
 from collections import Counter
 from modules.analysis import AnalysisModule
+from utils.sketch import SpaceSaving
 from utils.visualization import (
     print_table,
     print_plot,
@@ -13,21 +13,79 @@ from utils.visualization import (
 
 class WordsModule(AnalysisModule):
 
-    def __init__(self, analyzer, top_n=20):
+    __slots__ = ("top_n", "sketch_size")
+
+    inputs = ("tokens",)
+
+    def __init__(self, analyzer, top_n=20, sketch_size=None):
         super().__init__(analyzer, "words")
-        self.words = [w.lower() for w in analyzer.get_words() if w.isalpha()]
         self.top_n = top_n
-        self.word_counts = Counter(self.words)
-        self.total_words = len(self.words)
-        self.word_freq = [(word, count, round(count / self.total_words * 100, 2)) for word, count in self.word_counts.most_common(self.top_n)]
+        self.sketch_size = sketch_size
+
+    @property
+    def words(self) -> list:
+        return self.analyzer.get_input("lower_words")
+
+    @property
+    def word_freq(self) -> list:
+        tokens = self.analyzer.get_input("tokens")
+        total = int(tokens.alpha.sum())
+        top = tokens.most_common("lower", self.top_n, tokens.alpha)
+        return [(word, count, round(count / total * 100, 2)) for word, count in top]
+
+    def get_word_freq(self, word_counts, total_words) -> list:
+        return [(word, count, round(count / total_words * 100, 2)) for word, count in word_counts.most_common(self.top_n)]
 
     def analyze(self) -> dict:
+        # Only the top words are decoded when there is nothing to merge.
+        return self.format_word_freq(self.word_freq)
+
+    def partial(self) -> dict:
+        tokens = self.analyzer.get_input("tokens")
+        counts = Counter(tokens.counts("lower", tokens.alpha))
+        total = int(tokens.alpha.sum())
+        if self.sketch_size:
+            return self.sketch_partial(SpaceSaving(self.sketch_size).update(counts), total)
+        return {"counts": counts, "total": total}
+
+    def sketch_partial(self, sketch, total) -> dict:
+        return {"counts": sketch.counts, "errors": sketch.errors, "total": total}
+
+    def sketch(self, partial) -> SpaceSaving:
+        # Exact counts are a sketch without errors.
+        sketch = SpaceSaving(self.sketch_size)
+        sketch.counts, sketch.errors = partial["counts"], Counter(partial.get("errors", {}))
+        return sketch
+
+    def merge(self, partial, other) -> dict:
+        if self.sketch_size:
+            sketch = self.sketch(partial).merge(self.sketch(other))
+            return self.sketch_partial(sketch, partial["total"] + other["total"])
+        partial["counts"].update(other["counts"])
+        partial["total"] += other["total"]
+        return partial
+
+    def finalize(self, partial) -> dict:
+        if self.sketch_size:
+            total = partial["total"]
+            word_freq = [
+                (word, count, round(count / total * 100, 2), error)
+                for word, count, error in self.sketch(partial).most_common(self.top_n)
+            ]
+            return self.format_word_freq(word_freq)
+        return self.format_word_freq(self.get_word_freq(partial["counts"], partial["total"]))
+
+    def format_word_freq(self, word_freq) -> dict:
         word_stats = {
             word: {
                 "count": count, 
                 "freq": freq
-            } for word, count, freq in self.word_freq
+            } for word, count, freq, *_ in word_freq
         }
+        # Approximate counts overestimate the true ones by at most 'error'.
+        for word, _, _, *error in word_freq:
+            if error:
+                word_stats[word]["error"] = error[0]
         return word_stats
 
     def print_table(self):
@@ -0,0 +1,292 @@
+# src/server.py
+
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    MODULE_MAP,
+    SERVE_HOST,
+    SERVE_PORT,
+    SERVE_BATCH_SIZE,
+    SERVE_BATCH_WAIT,
+    SENTIMENT_BACKEND,
+    SENTIMENT_BACKENDS,
+    READABILITY_BACKEND,
+    READABILITY_BACKENDS
+)
+from utils.report import format_report
+
+
+OUTPUTS = ("json", "txt", "md")
+
+STATUS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error"
+}
+
+
+class BatchAnalyzer():
+
+    def __init__(
+        self,
+        batch_size: int = SERVE_BATCH_SIZE,
+        max_wait: float = SERVE_BATCH_WAIT,
+        cache=None
+        ):
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.cache = cache
+        self.batches = 0
+        self.queue = None
+        self.worker = None
+        # spaCy runs on a single thread, so the event loop keeps accepting
+        # requests while a batch is being parsed.
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def warm(self, focus, options=None):
+        self.analyze_batch(["Warm up."], focus, options)
+
+    def analyze_batch(self, texts, focus, options=None) -> list:
+        from analyzer import analyze_corpus
+        analyzers = analyze_corpus(
+            texts,
+            focus,
+            batch_size=self.batch_size,
+            cache=self.cache,
+            options=options
+        )
+        return [analyzer.analysis for analyzer in analyzers]
+
+    def start(self):
+        # One worker per analyzer, however many servers share it.
+        if self.worker is None:
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self.run())
+
+    async def analyze(self, text, focus, options=None) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        key = (tuple(focus), json.dumps(options or {}, sort_keys=True))
+        await self.queue.put((key, text, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            # Requests that arrive within max_wait of the first one share its
+            # nlp.pipe call.
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.batches += 1
+            groups = {}
+            for key, text, future in batch:
+                groups.setdefault(key, []).append((text, future))
+            for (focus, options), items in groups.items():
+                await self.resolve(items, list(focus), json.loads(options))
+
+    async def resolve(self, items, focus, options):
+        loop = asyncio.get_running_loop()
+        try:
+            analyses = await loop.run_in_executor(
+                self.executor,
+                self.analyze_batch,
+                [text for text, _ in items],
+                focus,
+                options
+            )
+        except Exception as e:
+            if len(items) > 1:
+                # A failing text must not fail the requests batched with it.
+                for item in items:
+                    await self.resolve([item], focus, options)
+                return
+            analyses = [e]
+        for (_, future), analysis in zip(items, analyses):
+            if future.done():
+                continue
+            if isinstance(analysis, Exception):
+                future.set_exception(analysis)
+            else:
+                future.set_result(analysis)
+
+
+class Server():
+
+    def __init__(
+        self,
+        analyzer: BatchAnalyzer,
+        focus=("text",),
+        options=None
+        ):
+        self.analyzer = analyzer
+        self.focus = list(focus)
+        self.options = options or {
+            "read": {"backend": READABILITY_BACKEND},
+            "sent": {"backend": SENTIMENT_BACKEND}
+        }
+        self.server = None
+
+    def parse_request(self, body: bytes):
+        request = json.loads(body or b"{}")
+        if not isinstance(request, dict):
+            raise ValueError("The request must be a JSON object")
+        text = request.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("'text' must be a non-empty string")
+        focus = request.get("analyze", self.focus)
+        unknown = [f for f in focus if f not in MODULE_MAP]
+        if unknown:
+            raise ValueError(f"Unsupported analysis: {', '.join(unknown)}")
+        output = request.get("output", "json")
+        if output not in OUTPUTS:
+            raise ValueError(f"Unsupported output: {output}")
+        readability = request.get("readability_backend", self.options["read"]["backend"])
+        if readability not in READABILITY_BACKENDS:
+            raise ValueError(f"Unsupported readability backend: {readability}")
+        sentiment = request.get("sentiment_backend", self.options["sent"]["backend"])
+        if sentiment not in SENTIMENT_BACKENDS:
+            raise ValueError(f"Unsupported sentiment backend: {sentiment}")
+        options = {
+            "read": {"backend": readability},
+            "sent": {"backend": sentiment}
+        }
+        return text, focus, output, options
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok", "batches": self.analyzer.batches}
+        if path != "/analyze":
+            return 404, {"error": f"Unknown path: {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+        try:
+            text, focus, output, options = self.parse_request(body)
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+        analysis = await self.analyzer.analyze(text, focus, options)
+        response = {"analysis": analysis}
+        if output != "json":
+            response["report"] = format_report(analysis, f"request.{output}")
+        return 200, response
+
+    async def handle(self, reader, writer):
+        try:
+            method, path, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+            length = 0
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            body = await reader.readexactly(length) if length else b""
+            status, payload = await self.route(method, path.split("?")[0], body)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+        content = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(content)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + content
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self, host=SERVE_HOST, port=SERVE_PORT, socket=None):
+        self.analyzer.start()
+        if socket:
+            self.server = await asyncio.start_unix_server(self.handle, path=socket)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    async def serve(self, host=SERVE_HOST, port=SERVE_PORT, socket=None):
+        server = await self.start(host, port, socket)
+        address = socket or "http://{}:{}".format(*server.sockets[0].getsockname()[:2])
+        print(f"climt serving on {address}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="climt serve",
+        description="Serve analyses over HTTP with a warm spaCy pipeline."
+    )
+    parser.add_argument(
+        "--host",
+        default=SERVE_HOST,
+        help="Address to listen on"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=SERVE_PORT,
+        help="Port to listen on"
+    )
+    parser.add_argument(
+        "--socket",
+        help="Listen on this Unix socket instead of a TCP port"
+    )
+    parser.add_argument(
+        "--analyze",
+        nargs="*",
+        choices=list(MODULE_MAP),
+        default=["text"],
+        help="Default focus of the analysis; its pipeline is loaded at startup"
+    )
+    parser.add_argument(
+        "--readability-backend",
+        choices=READABILITY_BACKENDS,
+        default=READABILITY_BACKEND,
+        help="Default engine used by the 'read' analysis"
+    )
+    parser.add_argument(
+        "--sentiment-backend",
+        choices=SENTIMENT_BACKENDS,
+        default=SENTIMENT_BACKEND,
+        help="Default engine used by the 'sent' analysis"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=SERVE_BATCH_SIZE,
+        help="Maximum number of requests parsed together"
+    )
+    parser.add_argument(
+        "--batch-wait",
+        type=float,
+        default=SERVE_BATCH_WAIT * 1000,
+        help="How long to wait for more requests before parsing a batch, in ms"
+    )
+    args = parser.parse_args(argv)
+
+    options = {
+        "read": {"backend": args.readability_backend},
+        "sent": {"backend": args.sentiment_backend}
+    }
+    analyzer = BatchAnalyzer(args.batch_size, args.batch_wait / 1000)
+    analyzer.warm(args.analyze, options)
+    server = Server(analyzer, args.analyze, options)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,90 @@
+# src/utils/cache.py
+
+import hashlib
+import os
+from pathlib import Path
+from spacy.tokens import DocBin
+from config import CACHE_DIR, CACHE_MAX_SIZE, CACHE_EVICT_TO
+
+
+class DocCache():
+
+    def __init__(
+        self,
+        directory=CACHE_DIR,
+        max_size: int = CACHE_MAX_SIZE
+        ):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.size = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, text: str, nlp) -> str:
+        meta = nlp.meta
+        digest = hashlib.sha256()
+        digest.update(f"{meta['lang']}_{meta['name']}-{meta['version']}".encode())
+        digest.update(",".join(nlp.pipe_names).encode())
+        digest.update(text.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.spacy"
+
+    def contains(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def get(self, key: str, nlp):
+        path = self.path(key)
+        try:
+            doc_bin = DocBin().from_disk(path)
+        except (OSError, ValueError):
+            return None
+        # The modification time doubles as the last access time for eviction.
+        os.utime(path)
+        return next(doc_bin.get_docs(nlp.vocab))
+
+    def put(self, key: str, doc):
+        path = self.path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        DocBin(docs=[doc]).to_disk(tmp)
+        size = tmp.stat().st_size
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp, path)
+        # The directory is only scanned for the first put and when the cache
+        # grows over max_size; the total is kept up to date in between.
+        if self.size is None:
+            self.size = self.scan()[1]
+        else:
+            self.size += size - replaced
+        if self.size > self.max_size:
+            self.evict()
+
+    def scan(self) -> tuple:
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".spacy"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        return entries, total
+
+    def evict(self):
+        # Down to a fraction of max_size, so that a full cache is not scanned
+        # again at every put. Rescanning also corrects the running total for
+        # entries written or removed by other processes.
+        entries, total = self.scan()
+        entries.sort()
+        target = self.max_size * CACHE_EVICT_TO
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.size = total
@@ -0,0 +1,47 @@
+# src/utils/chunk.py
+
+from config import CHUNK_SIZE
+
+
+def join_texts(
+    texts,
+    separator="\n\n"
+    ):
+    # Each text is either a string or an iterable of pieces of one.
+    for i, text in enumerate(texts):
+        if i:
+            yield separator
+        if isinstance(text, str):
+            yield text
+        else:
+            yield from text
+
+
+def iter_chunks(
+    pieces,
+    chunk_size: int = CHUNK_SIZE
+    ):
+    # Chunks concatenate back to the input exactly: each one ends right after
+    # a line break when possible, otherwise after a full stop or a space.
+    if isinstance(pieces, str):
+        pieces = (pieces,)
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        # Cuts advance an offset, so a large piece is not copied once per chunk.
+        start = 0
+        while len(buffer) - start > chunk_size:
+            end = start + chunk_size
+            cut = buffer.rfind("\n", start, end) + 1
+            if not cut:
+                cut = buffer.rfind(". ", start, end - 1) + 2
+                cut = cut if cut > 1 else 0
+            if not cut:
+                cut = buffer.rfind(" ", start, end) + 1
+            if not cut:
+                cut = end
+            yield buffer[start:cut]
+            start = cut
+        buffer = buffer[start:]
+    if buffer:
+        yield buffer
@@ -0,0 +1,96 @@
+# src/utils/dedupe.py
+
+import re
+import zlib
+import numpy as np
+from config import NEAR_DUPLICATE_THRESHOLD, MINHASH_PERMUTATIONS, SHINGLE_SIZE
+
+# Hashes are permuted as (a * x + b) mod a Mersenne prime, kept to 32 bits.
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+SHINGLE_BASE = np.uint64(1_000_003)
+
+WORD_RE = re.compile(r"\w+")
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE):
+    # Shingles of `size` lowercase words, so that the same document extracted
+    # from docx and from pdf agrees despite different whitespace.
+    words = WORD_RE.findall(text.lower())
+    hashes = np.fromiter((zlib.crc32(w.encode()) for w in words), dtype=np.uint64, count=len(words))
+    size = max(1, min(size, len(hashes)))
+    count = len(hashes) - size + 1
+    shingles = np.zeros(max(count, 0), dtype=np.uint64)
+    for i in range(size):
+        shingles = shingles * SHINGLE_BASE + hashes[i:i + count]
+    return np.unique(shingles)
+
+
+def optimal_bands(threshold: float, num_perm: int) -> tuple:
+    # Bands and rows that minimize the probability mass of false positives
+    # below the threshold plus that of false negatives above it.
+    s = np.linspace(0, 1, 201)
+    below, above = s <= threshold, s >= threshold
+    best = None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            candidate = 1 - (1 - s ** rows) ** bands
+            error = np.trapezoid(candidate[below], s[below]) + np.trapezoid(1 - candidate[above], s[above])
+            if best is None or error < best[0]:
+                best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class NearDuplicates():
+
+    def __init__(
+        self,
+        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+        num_perm: int = MINHASH_PERMUTATIONS,
+        shingle_size: int = SHINGLE_SIZE,
+        seed: int = 1
+        ):
+
+        if not 0 < threshold <= 1:
+            raise ValueError("The similarity threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.signatures = {}
+
+    def signature(self, text: str, block: int = 2048):
+        # Blocks of shingles bound the size of the permuted hash matrix.
+        shingles = shingle_hashes(text, self.shingle_size)
+        signature = np.full(len(self.a), MAX_HASH, dtype=np.uint64)
+        for start in range(0, len(shingles), block):
+            values = shingles[start:start + block, None]
+            permuted = (values * self.a + self.b) % MERSENNE_PRIME & MAX_HASH
+            np.minimum(signature, permuted.min(axis=0), out=signature)
+        return signature
+
+    def band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key, text: str):
+        # Compared with the earlier representatives only: returns the most
+        # similar one above the threshold, or None when `key` starts a group.
+        signature = self.signature(text)
+        candidates = {}
+        for band, bucket in self.band_keys(signature):
+            candidates.update(dict.fromkeys(self.buckets[band].get(bucket, ())))
+        match, similarity = None, 0.0
+        for candidate in candidates:
+            estimate = float(np.mean(signature == self.signatures[candidate]))
+            if estimate >= self.threshold and estimate > similarity:
+                match, similarity = candidate, estimate
+        if match is not None:
+            return {"of": match, "similarity": round(similarity, 3)}
+        self.signatures[key] = signature
+        for band, bucket in self.band_keys(signature):
+            self.buckets[band].setdefault(bucket, []).append(key)
+        return None
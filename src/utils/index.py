@@ -0,0 +1,101 @@
+# src/utils/index.py
+
+import hashlib
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from config import INDEX_FILE
+
+
+def file_hash(path, block_size=1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def to_json(value):
+    # Counters and sets are tagged so that they come back as such: module
+    # merges rely on Counter.update and set union.
+    if isinstance(value, Counter):
+        return {"__counter__": dict(value)}
+    if isinstance(value, (set, frozenset)):
+        return {"__set__": sorted(value)}
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    return value
+
+
+def from_json(value: dict):
+    if "__counter__" in value:
+        return Counter(value["__counter__"])
+    if "__set__" in value:
+        return set(value["__set__"])
+    return value
+
+
+class CorpusIndex():
+
+    def __init__(
+        self,
+        path=INDEX_FILE,
+        signature: dict = None
+        ):
+        self.path = Path(path)
+        self.signature = signature or {}
+        self.files = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f, object_hook=from_json)
+            # Aggregates computed with another model or other module options
+            # cannot be merged with new ones.
+            if state.get("signature") == to_json(self.signature):
+                self.files = state.get("files", {})
+
+    def key(self, path) -> str:
+        return str(Path(path).resolve())
+
+    def get(self, path, focus):
+        entry = self.files.get(self.key(path))
+        if entry is None:
+            return None
+        stat = os.stat(path)
+        if (entry["mtime"], entry["size"]) != (stat.st_mtime, stat.st_size):
+            digest = file_hash(path)
+            if digest != entry["hash"]:
+                return None
+            # Touched but unchanged: the aggregates are still valid.
+            entry["mtime"], entry["size"] = stat.st_mtime, stat.st_size
+        if not all(f in entry["partials"] for f in focus):
+            return None
+        return {f: entry["partials"][f] for f in focus}
+
+    def put(self, path, partials: dict):
+        key = self.key(path)
+        stat = os.stat(path)
+        digest = file_hash(path)
+        entry = self.files.get(key)
+        if entry is None or entry["hash"] != digest:
+            entry = {"partials": {}}
+            self.files[key] = entry
+        entry.update({"mtime": stat.st_mtime, "size": stat.st_size, "hash": digest})
+        entry["partials"].update(partials)
+
+    def prune(self):
+        for key in [key for key in self.files if not os.path.exists(key)]:
+            del self.files[key]
+
+    def save(self):
+        self.prune()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "signature": to_json(self.signature),
+                "files": to_json(self.files)
+            }, f)
+        os.replace(tmp, self.path)
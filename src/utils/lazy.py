@@ -0,0 +1,23 @@
+# src/utils/lazy.py
+
+import importlib
+from collections.abc import Mapping
+
+
+class LazyImportMap(Mapping):
+
+    def __init__(self, paths: dict):
+        self._paths = paths
+        self._objects = {}
+
+    def __getitem__(self, key):
+        if key not in self._objects:
+            module, name = self._paths[key].rsplit(".", 1)
+            self._objects[key] = getattr(importlib.import_module(module), name)
+        return self._objects[key]
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
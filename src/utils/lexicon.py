@@ -0,0 +1,188 @@
+# src/utils/lexicon.py
+
+import importlib.util
+import os
+import re
+from functools import lru_cache
+from xml.etree import ElementTree
+
+
+# Scoring rules of the pattern library, which TextBlob's default sentiment
+# analyzer implements. The lexicon file ships with TextBlob.
+NEGATIONS = ("no", "not", "n't", "never")
+
+MODIFIER_TAG = "RB"
+
+PUNCTUATION = ".,;:!?()[]{}`''\"@#$^&*+-|=~_"
+
+EMOTICONS = {
+    1.00: ("<3", "♥", ">:D", ":-D", ":D", "=-D", "=D", "X-D", "x-D", "XD", "xD", "8-D"),
+    0.75: (">:P", ":-P", ":P", ":-p", ":p", ":-b", ":b", ":c)", ":o)", ":^)"),
+    0.50: (">:)", ":-)", ":)", "=)", "=]", ":]", ":}", ":>", ":3", "8)", "8-)"),
+    0.25: (">;]", ";-)", ";)", ";-]", ";]", ";D", ";^)", "*-)", "*)"),
+    0.05: (">:o", ":-O", ":O", ":o", ":-o", "o_O", "o.O", "°O°", "°o°"),
+    -0.25: (">:/", ":-/", ":/", ":\\", ">:\\", ":-.", ":-s", ":s", ":S", ":-S", ">.>"),
+    -0.75: (">:[", ":-(", ":(", "=(", ":-[", ":[", ":{", ":-<", ":c", ":-c", "=/"),
+    -1.00: (":'(", ":'''(", ";'("),
+}
+
+# Emoticons are matched in lowercase, the first group listed winning.
+FACES = {}
+for polarity, faces in EMOTICONS.items():
+    for face in faces:
+        FACES.setdefault(face.lower(), polarity)
+
+
+# Tokenization of pattern's find_tokens, which TextBlob scores a string with;
+# spaCy's tokens differ on contractions, repeated punctuation and emoticons.
+CONTRACTIONS = ("'d", "'m", "'s", "'ll", "'re", "'ve", "n't")
+
+QUOTES = ("“", "”", "‘", "’", "'", '"')
+
+ABBREVIATIONS = {
+    "a.", "adj.", "adv.", "al.", "a.m.", "c.", "cf.", "comp.", "conf.", "def.",
+    "ed.", "e.g.", "esp.", "etc.", "ex.", "f.", "fig.", "gen.", "id.", "i.e.",
+    "int.", "l.", "m.", "Med.", "Mil.", "Mr.", "n.", "n.q.", "orig.", "pl.",
+    "pred.", "pres.", "p.m.", "ref.", "v.", "vs.", "w/"
+}
+
+ABBREVIATION_RES = (
+    re.compile(r"^[A-Za-z]\.$"),
+    re.compile(r"^([A-Za-z]\.)+$"),
+    re.compile("^[A-Z][" + "|".join("bcdfghjklmnpqrstvwxz") + "]+.$")
+)
+
+SARCASM_RE = re.compile(r"\( ?\! ?\)")
+
+# Emoticons split up by the punctuation rules are joined again, in their
+# original case.
+EMOTICONS_RE = re.compile(r"(%s)($|\s)" % "|".join(
+    r" ?".join(re.escape(c) for c in face)
+    for faces in EMOTICONS.values() for face in faces
+))
+
+
+def is_abbreviation(token: str) -> bool:
+    return token in ABBREVIATIONS or any(r.match(token) for r in ABBREVIATION_RES)
+
+
+def tokenize(text: str) -> list:
+    # Lowercase words as pattern's tokenizer splits them: "isn't" gives
+    # "is n ' t", so that "n't" is never a negation, "!!!" gives three
+    # exclamation marks and "(!)" the irony marker.
+    for contraction in CONTRACTIONS:
+        text = text.replace(contraction, " " + contraction)
+    for quote in QUOTES:
+        text = text.replace(quote, f" {quote} ")
+    leading = tuple(PUNCTUATION.replace(".", ""))
+    trailing = leading + (".",)
+    tokens = []
+    for t in text.split():
+        tail = []
+        while t.startswith(leading) and t not in CONTRACTIONS:
+            tokens.append(t[0])
+            t = t[1:]
+        while t.endswith(trailing) and t not in CONTRACTIONS:
+            if t.endswith(leading):
+                tail.append(t[-1])
+                t = t[:-1]
+            if t.endswith("..."):
+                tail.append("...")
+                t = t[:-3].rstrip(".")
+            if t.endswith("."):
+                if is_abbreviation(t):
+                    break
+                tail.append(".")
+                t = t[:-1]
+        if t:
+            tokens.append(t)
+        tokens.extend(reversed(tail))
+    text = SARCASM_RE.sub("(!)", " ".join(tokens))
+    text = EMOTICONS_RE.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), text)
+    return text.lower().split()
+
+
+def lexicon_path() -> str:
+    spec = importlib.util.find_spec("textblob")
+    return os.path.join(spec.submodule_search_locations[0], "en", "en-sentiment.xml")
+
+
+def average(values) -> float:
+    return sum(values) / float(len(values) or 1)
+
+
+class SentimentLexicon():
+
+    def __init__(self, path):
+        self.scores = {}
+        self.modifiers = set()
+        senses = {}
+        for word in ElementTree.parse(path).getroot().findall("word"):
+            form = word.attrib.get("form")
+            if not form:
+                continue
+            psi = (
+                float(word.attrib.get("polarity", 0.0)),
+                float(word.attrib.get("subjectivity", 0.0)),
+                float(word.attrib.get("intensity", 1.0)),
+            )
+            senses.setdefault(form, {}).setdefault(word.attrib.get("pos"), []).append(psi)
+        adjectives = {}
+        for form, tags in senses.items():
+            tags = {tag: [average(each) for each in zip(*psi)] for tag, psi in tags.items()}
+            self.scores[form] = tuple(average(each) for each in zip(*tags.values()))
+            if MODIFIER_TAG in tags:
+                self.modifiers.add(form)
+            if "JJ" in tags:
+                adjectives[form] = tuple(tags["JJ"])
+        # Adverbs derived from adjectives ("happy" -> "happily").
+        for form, psi in adjectives.items():
+            if form.endswith("y"):
+                form = form[:-1] + "i"
+            if form.endswith("le"):
+                form = form[:-2]
+            self.scores[form + "ly"] = psi
+            self.modifiers.add(form + "ly")
+
+    def assess(self, words) -> list:
+        assessments = []
+        modifier = None
+        negation = None
+        for w in words:
+            if w in self.scores:
+                p, s, i = self.scores[w]
+                if modifier is None:
+                    assessments.append([p, s, i, 1])
+                else:
+                    last = assessments[-1]
+                    last[0] = max(-1.0, min(p * last[2], +1.0))
+                    last[1] = max(-1.0, min(s * last[2], +1.0))
+                    last[2] = i
+                if negation is not None:
+                    assessments[-1][2] = 1.0 / assessments[-1][2]
+                    assessments[-1][3] = -1
+                modifier = w if w in self.modifiers else None
+                negation = w if w in NEGATIONS else None
+            else:
+                if w in NEGATIONS:
+                    negation = w
+                elif negation and len(w.strip("'")) > 1:
+                    negation = None
+                if negation is not None and modifier is not None and modifier.endswith("ly"):
+                    assessments[-1][3] = -1
+                    negation = None
+                elif modifier and len(w) > 2:
+                    modifier = None
+                if w == "!" and assessments:
+                    assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, +1.0))
+                if w == "(!)":
+                    assessments.append([0.0, 1.0, 1.0, 1])
+                if not w.isalpha() and len(w) <= 5 and w not in PUNCTUATION and w in FACES:
+                    assessments.append([FACES[w], 1.0, 1.0, 1])
+        # "not good" = slightly bad, "not bad" = slightly good.
+        return [(p * -0.5 if n < 0 else p, s) for p, s, _, n in assessments]
+
+
+@lru_cache(maxsize=None)
+def load_lexicon(path=None) -> SentimentLexicon:
+    return SentimentLexicon(path or lexicon_path())
@@ -1,63 +1,260 @@
 # src/utils/load.py
 
-import PyPDF2
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fnmatch import fnmatch
+from itertools import islice
+from multiprocessing import get_context
 from pathlib import Path
-from docx import Document
-from config import SUPPORTED_EXTENSIONS
+from config import SUPPORTED_EXTENSIONS, LOAD_WORKERS, LOAD_PREFETCH, LOAD_BLOCK_SIZE
+from utils.index import file_hash
 
 
 def load_file(path) -> str:
-    path = Path(path) 
+    return "".join(iter_file(path))
+
+
+def iter_file(
+    path,
+    block_size: int = LOAD_BLOCK_SIZE
+    ):
+
+    # Yields the text of a file in blocks of about block_size characters that
+    # concatenate to what load_file returns, without holding the whole file.
+    path = Path(path)
     suffix = path.suffix.lower()
     if suffix == ".txt":
-        with open(path, "r", encoding="utf-8") as f:
-            text = f.read()
-        text = "\n".join([p.strip() for p in text.splitlines() if p.strip()])
-        return text
+        lines = iter_txt_lines(path)
     elif suffix == ".docx":
-        doc = Document(path)
-        return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+        lines = iter_docx_paragraphs(path)
     elif suffix == ".pdf":
-        text = []
-        with open(path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text.append(page_text)
-        return "\n".join(text)
+        lines = iter_pdf_pages(path)
     else:
         raise ValueError(f"Unsupported file type: {suffix}")
+    return join_lines(lines, block_size)
+
+
+def iter_txt_lines(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for raw in iter(mm.readline, b""):
+                for line in raw.decode("utf-8").splitlines():
+                    line = line.strip()
+                    if line:
+                        yield line
 
 
-def collect_files(paths: list):
-    collected = []
+def iter_docx_paragraphs(path):
+    from docx import Document
+    for p in Document(path).paragraphs:
+        if p.text.strip():
+            yield p.text
+
+
+def iter_pdf_pages(path):
+    import PyPDF2
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        for page in reader.pages:
+            page_text = page.extract_text()
+            if page_text:
+                yield page_text
+
+
+def join_lines(
+    lines,
+    block_size: int = LOAD_BLOCK_SIZE
+    ):
+
+    block = []
+    size = 0
+    separator = ""
+    for line in lines:
+        block.append(line)
+        size += len(line) + 1
+        if size >= block_size:
+            yield separator + "\n".join(block)
+            separator = "\n"
+            block = []
+            size = 0
+    if block:
+        yield separator + "\n".join(block)
+
+
+def discover_files(
+    paths: list,
+    include: list = None,
+    exclude: list = None,
+    max_depth: int = 0,
+    min_size: int = None,
+    max_size: int = None,
+    dedupe: bool = False
+    ):
+
+    # The given paths are checked up front; directories are then walked
+    # lazily, so the first file is available before the tree is listed.
     for p in paths:
         path = Path(p)
-        if path.is_dir():
-            for f in path.iterdir():
-                if f.suffix.lower() in SUPPORTED_EXTENSIONS:
-                    collected.append(f)
-        elif path.is_file():
-            if path.suffix.lower() in SUPPORTED_EXTENSIONS:
-                collected.append(path)
-            else:
+        if path.is_file():
+            if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
                 raise ValueError(f"Unsupported file type: {path.suffix}")
-        else:
+        elif not path.is_dir():
             raise FileNotFoundError(f"Path not found: {p}")
-    return collected
+    files = walk_files(paths, include, exclude, max_depth, min_size, max_size)
+    return dedupe_files(files) if dedupe else files
+
+
+def walk_files(
+    paths: list,
+    include: list = None,
+    exclude: list = None,
+    max_depth: int = 0,
+    min_size: int = None,
+    max_size: int = None
+    ):
+
+    def matches(patterns, entry, root):
+        relative = Path(os.path.relpath(entry.path, root)).as_posix()
+        return any(fnmatch(relative, p) or fnmatch(entry.name, p) for p in patterns)
+
+    def accepts(size):
+        return (min_size is None or size >= min_size) and (max_size is None or size <= max_size)
+
+    for p in paths:
+        root = Path(p)
+        if root.is_file():
+            if accepts(root.stat().st_size):
+                yield root
+            continue
+        visited = {(root.stat().st_dev, root.stat().st_ino)}
+        # Depth-first, in name order within each directory; only the listings
+        # of the directories on the current branch are held at once.
+        stack = [iter(sorted(os.scandir(root), key=lambda e: e.name))]
+        while stack:
+            entry = next(stack[-1], None)
+            if entry is None:
+                stack.pop()
+                continue
+            if exclude and matches(exclude, entry, root):
+                continue
+            if entry.is_dir():
+                stat = entry.stat()
+                if (max_depth is None or len(stack) <= max_depth) and (stat.st_dev, stat.st_ino) not in visited:
+                    visited.add((stat.st_dev, stat.st_ino))
+                    stack.append(iter(sorted(os.scandir(entry.path), key=lambda e: e.name)))
+                continue
+            if not entry.is_file() or Path(entry.name).suffix.lower() not in SUPPORTED_EXTENSIONS:
+                continue
+            if include and not matches(include, entry, root):
+                continue
+            if accepts(entry.stat().st_size):
+                yield Path(entry.path)
+
+
+def dedupe_files(files):
+    # Files are only hashed once another file of the same size shows up.
+    by_size = {}
+    hashes = set()
+    for f in files:
+        size = f.stat().st_size
+        if size not in by_size:
+            by_size[size] = f
+            yield f
+            continue
+        first = by_size[size]
+        if first is not None:
+            hashes.add(file_hash(first))
+            by_size[size] = None
+        digest = file_hash(f)
+        if digest not in hashes:
+            hashes.add(digest)
+            yield f
+
+
+def collect_files(paths: list, **discovery) -> list:
+    return list(discover_files(paths, **discovery))
+
+
+def iter_files(
+    paths: list,
+    max_workers: int = LOAD_WORKERS,
+    prefetch: int = LOAD_PREFETCH,
+    **discovery
+    ):
+
+    return load_in_order(discover_files(paths, **discovery), max_workers, prefetch)
+
+
+def stream_files(
+    paths: list,
+    block_size: int = LOAD_BLOCK_SIZE,
+    **discovery
+    ):
+
+    files = discover_files(paths, **discovery)
+    return ((f, iter_file(f, block_size)) for f in files)
+
+
+def load_in_order(
+    files,
+    max_workers: int = LOAD_WORKERS,
+    prefetch: int = LOAD_PREFETCH
+    ):
+
+    remaining = iter(files)
+    if max_workers <= 1:
+        for f in remaining:
+            yield f, load_file(f)
+        return
+    # PDF extraction is CPU bound: from the second PDF on, it goes to worker
+    # processes when more than one core is available. Text and docx reads are
+    # I/O bound and use threads.
+    cpus = min(max_workers, os.cpu_count() or 1)
+    pdfs = 0
+    processes = None
+    with ThreadPoolExecutor(max_workers) as threads:
+
+        def submit(f):
+            nonlocal pdfs, processes
+            if f.suffix.lower() == ".pdf" and cpus > 1:
+                pdfs += 1
+                if pdfs > 1:
+                    if processes is None:
+                        processes = ProcessPoolExecutor(cpus, mp_context=get_context("spawn"))
+                    return f, processes.submit(load_file, f)
+            return f, threads.submit(load_file, f)
+
+        # At most `prefetch` files are loaded ahead of the consumer.
+        pending = deque(submit(f) for f in islice(remaining, max(prefetch, 1)))
+        try:
+            while pending:
+                f, future = pending.popleft()
+                for following in islice(remaining, 1):
+                    pending.append(submit(following))
+                yield f, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+            if processes is not None:
+                processes.shutdown()
 
 
 def load_files(
     paths: list,
-    mode: str = "merge"
+    mode: str = "merge",
+    max_workers: int = LOAD_WORKERS,
+    prefetch: int = LOAD_PREFETCH,
+    **discovery
     ):
 
-    files = collect_files(paths)
+    loaded = iter_files(paths, max_workers, prefetch, **discovery)
     if mode == "merge":
-        texts = [load_file(f) for f in files]
-        return texts
+        return (text for _, text in loaded)
     elif mode == "separate":
-        return {f.name: load_file(f) for f in files}
+        return {f.name: text for f, text in loaded}
     else:
         raise ValueError("Mode must be 'merge' or 'separate'")
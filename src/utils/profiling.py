@@ -0,0 +1,253 @@
+# src/utils/profiling.py
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from config import PROFILE_MODE, PROFILE_MODES, PROFILE_INTERVAL, REPORT_DIR
+from utils.report import DocumentNames
+from utils.timings import Timings
+
+ROOT_PHASE = "main"
+
+
+class StatsSnapshot():
+
+    # What pstats.Stats expects from a profiler: a create_stats() method and
+    # a stats dict keyed by (file, line, function).
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def code_key(code) -> tuple:
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def collapse_stats(stats: dict, prefix: str, lines: Counter, min_share=1e-4):
+    # cProfile keeps callers, not stacks: each function's time is split
+    # between its call paths in proportion to the time of each call edge.
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    total = sum(tt for _, _, tt, _, _ in stats.values()) or 1
+
+    def walk(func, path, labels, inclusive):
+        _, _, tt, ct, _ = stats[func]
+        if ct <= 0 or inclusive / total < min_share:
+            return
+        own = inclusive * tt / ct
+        if own > 0:
+            lines[";".join(labels)] += own
+        for callee, edge_ct in callees.get(func, ()):
+            if callee not in path and stats[callee][3] > 0:
+                walk(callee, path | {callee}, labels + [label(callee)], edge_ct * inclusive / ct)
+
+    # Roots are the calls from outside the profile, e.g. from the function
+    # that entered the phase; recursive calls are not told apart from them.
+    for func, (_, _, _, ct, callers) in stats.items():
+        external = ct - sum(edge[3] for caller, edge in callers.items() if caller != func)
+        if external > 0:
+            walk(func, {func}, [prefix, label(func)], external)
+
+
+def sample_stats(samples: Counter, interval: float) -> dict:
+    # pstats entries rebuilt from sampled stacks: self time for the leaf,
+    # inclusive time once per stack for every function on it.
+    stats = {}
+
+    def entry(func):
+        return stats.setdefault(func, [0, 0, 0.0, 0.0, {}])
+
+    for (_, stack), count in samples.items():
+        elapsed = count * interval
+        entry(stack[-1])[2] += elapsed
+        for func in set(stack):
+            values = entry(func)
+            values[0] += count
+            values[1] += count
+            values[3] += elapsed
+        for caller, callee in set(zip(stack, stack[1:])):
+            edge = entry(callee)[4].setdefault(caller, [0, 0, 0.0, 0.0])
+            edge[0] += count
+            edge[1] += count
+            edge[3] += elapsed
+            if callee == stack[-1]:
+                edge[2] += elapsed
+    return {
+        func: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+        for func, (cc, nc, tt, ct, callers) in stats.items()
+    }
+
+
+class Profiler(Timings):
+
+    def __init__(
+        self,
+        mode: str = PROFILE_MODE,
+        interval: float = PROFILE_INTERVAL,
+        per_document: bool = False
+        ):
+
+        # Phase timings are recorded as with --timings, without memory
+        # tracing, which would distort the profile.
+        super().__init__(trace_memory=False)
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unsupported profiler: {mode}")
+        self.mode = mode
+        self.interval = interval
+        self.per_document = per_document
+        self.phases_stack = [ROOT_PHASE]
+        self.profiles = {}
+        self._profiles = {}
+        self._samples = Counter()
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._running = False
+        self._stopped = threading.Event()
+
+    def start(self):
+        self._running = True
+        if self.mode == "cprofile":
+            self._profile(ROOT_PHASE).enable()
+        else:
+            self._sampler = threading.Thread(target=self._sample, name="climt-profiler", daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        if self.mode == "cprofile":
+            self._profile(self.phases_stack[-1]).disable()
+        else:
+            self._stopped.set()
+            self._sampler.join()
+        self._running = False
+        self.flush(None)
+
+    def _profile(self, tag) -> cProfile.Profile:
+        if tag not in self._profiles:
+            self._profiles[tag] = cProfile.Profile()
+        return self._profiles[tag]
+
+    def _switch(self, before, after):
+        # cProfile allows one active profiler per thread: the current phase
+        # has its own, so that its stats stay apart.
+        if self.mode == "cprofile" and self._running:
+            self._profile(before).disable()
+            self._profile(after).enable()
+
+    @contextmanager
+    def phase(self, name):
+        self._switch(self.phases_stack[-1], name)
+        self.phases_stack.append(name)
+        try:
+            with super().phase(name):
+                yield
+        finally:
+            self.phases_stack.pop()
+            self._switch(name, self.phases_stack[-1])
+
+    def _sample(self):
+        main = threading.main_thread().ident
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            tag = self.phases_stack[-1]
+            for thread, frame in sys._current_frames().items():
+                if thread == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(code_key(frame.f_code))
+                    frame = frame.f_back
+                # Other threads, such as the file loaders, are tagged by name.
+                key = (tag if thread == main else f"thread:{names.get(thread, thread)}", tuple(reversed(stack)))
+                with self._lock:
+                    self._samples[key] += 1
+
+    def _snapshot(self) -> dict:
+        # Stats per phase tag collected since the last snapshot.
+        if self.mode == "sample":
+            with self._lock:
+                samples, self._samples = self._samples, Counter()
+            tags = {}
+            for (tag, stack), count in samples.items():
+                tags.setdefault(tag, Counter())[(tag, stack)] += count
+            return {tag: sample_stats(counts, self.interval) for tag, counts in tags.items()}
+        current = self.phases_stack[-1]
+        snapshot = {}
+        for tag, profile in self._profiles.items():
+            profile.create_stats()
+            if profile.stats:
+                snapshot[tag] = profile.stats
+        self._profiles = {}
+        if self._running:
+            self._profile(current).enable()
+        return snapshot
+
+    def flush(self, document):
+        # In per-document mode, everything since the previous flush is
+        # attributed to `document`; otherwise to the whole run.
+        key = document if self.per_document else None
+        for tag, stats in self._snapshot().items():
+            merge_stats(self.profiles.setdefault(key, {}).setdefault(tag, {}), stats)
+
+    def save(self, basename: str, directory=REPORT_DIR) -> list:
+        os.makedirs(directory, exist_ok=True)
+        total = {}
+        for phases in self.profiles.values():
+            for tag, stats in phases.items():
+                merge_stats(total.setdefault(tag, {}), stats)
+        paths = write_profile(total, os.path.join(directory, basename))
+        if self.per_document:
+            names = DocumentNames()
+            for document, phases in self.profiles.items():
+                if document is not None:
+                    name = f"{basename}.{names(document)}"
+                    paths.extend(write_profile(phases, os.path.join(directory, name)))
+        return paths
+
+
+def merge_stats(target: dict, stats: dict):
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        if func not in target:
+            target[func] = (cc, nc, tt, ct, dict(callers))
+            continue
+        tcc, tnc, ttt, tct, tcallers = target[func]
+        for caller, edge in callers.items():
+            previous = tcallers.get(caller)
+            tcallers[caller] = edge if previous is None else tuple(a + b for a, b in zip(previous, edge))
+        target[func] = (tcc + cc, tnc + nc, ttt + tt, tct + ct, tcallers)
+
+
+def write_profile(phases: dict, path: str) -> list:
+    merged = {}
+    lines = Counter()
+    for tag, stats in phases.items():
+        merge_stats(merged, stats)
+        collapse_stats(stats, tag if tag.startswith("thread:") else f"phase:{tag}", lines)
+    paths = []
+    if merged:
+        pstats.Stats(StatsSnapshot(merged)).dump_stats(f"{path}.pstats")
+        paths.append(f"{path}.pstats")
+    # Collapsed stacks, one "frame;frame;... microseconds" line per stack,
+    # as flamegraph.pl and speedscope read them.
+    with open(f"{path}.collapsed.txt", "w", encoding="utf-8") as f:
+        for stack, seconds in sorted(lines.items()):
+            microseconds = round(seconds * 1e6)
+            if microseconds:
+                f.write(f"{stack} {microseconds}\n")
+    paths.append(f"{path}.collapsed.txt")
+    return paths
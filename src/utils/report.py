@@ -1,11 +1,16 @@
 # src/utils/report.py
 
+import csv
+import json
 import os
-from config import MODULE_MAP, REPORT_DIR
-from tabulate import tabulate
+from pathlib import Path
+from config import MODULE_MAP, REPORT_DIR, REPORT_FLUSH_EVERY
+
+CSV_FIELDS = ("document", "module", "key", "value")
 
 
 def format_freq_table(data: dict) -> str:
+    from tabulate import tabulate
     rows = []
     headers = ["item", "count", "freq (%)"]
     for key, stats in data.items():
@@ -19,7 +24,7 @@ def format_section(
     ) -> str:
 
     lines = [f"\n## {title.upper()}"]
-    if title.lower() in {"words", "pos"}:
+    if title.lower() in {"words", "pos", "ngrams"}:
         lines.append(format_freq_table(data))
     else:
         for key, value in data.items():
@@ -28,22 +33,170 @@ def format_section(
     return "\n".join(lines)
 
 
-def generate_txt_report(
+def format_report(
     analysis: dict,
     filename: str
-    ):
+    ) -> str:
 
-    os.makedirs(REPORT_DIR, exist_ok=True)
     sections = [f"# DATA REPORT FOR {filename}"]
-    for module in MODULE_MAP.keys():
+    # Corpus-level sections, such as tfidf, follow the per-document modules.
+    extra = [module for module in analysis if module not in MODULE_MAP]
+    for module in [*MODULE_MAP.keys(), *extra]:
         if module in analysis:
             sections.append(format_section(module, analysis[module]))
-    report_content = "\n".join(sections)
+    return "\n".join(sections)
+
+
+def generate_txt_report(
+    analysis: dict,
+    filename: str
+    ):
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    report_content = format_report(analysis, filename)
     filepath = os.path.join(REPORT_DIR, filename)
     with open(filepath, "w") as f:
         f.write(report_content)
 
 
+def flatten(
+    data: dict,
+    prefix: str = ""
+    ):
+
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        else:
+            yield path, value
+
+
+def write_jsonl_record(
+    f,
+    analysis: dict,
+    document: str = None
+    ):
+
+    f.write(json.dumps({"document": document, **analysis}) + "\n")
+
+
+def write_csv_record(
+    f,
+    analysis: dict,
+    document: str = None
+    ):
+
+    # One row per value, so that the columns are the same for every document.
+    writer = csv.writer(f)
+    for module, data in analysis.items():
+        for key, value in flatten(data):
+            writer.writerow((document, module, key, value))
+
+
+def write_csv_header(f):
+    csv.writer(f).writerow(CSV_FIELDS)
+
+
+def generate_record_report(
+    analysis: dict,
+    filename: str
+    ):
+
+    name, fmt = os.path.splitext(filename)
+    with ReportWriter(name, fmt.lstrip(".")) as writer:
+        writer.write(analysis)
+
+
+class DocumentNames():
+
+    # Report names of documents: the file stem, unless an earlier document
+    # took it; then the stem and extension for files of the same folder, or
+    # the stem behind its parent folders, e.g. "sub__notes". Names follow
+    # the order of the documents, so that every writer gives the same ones.
+    def __init__(self):
+        self.names = {}
+        self.owners = {}
+
+    def __call__(self, document: str) -> str:
+        if document not in self.names:
+            path = Path(document)
+            name = next(n for n in self.candidates(path) if n not in self.owners)
+            self.owners[name] = path
+            self.names[document] = name
+        return self.names[document]
+
+    def candidates(self, path: Path):
+        stem = path.stem
+        extension = f"{stem}_{path.suffix.lstrip('.')}" if path.suffix else None
+        yield stem
+        owner = self.owners.get(stem)
+        if extension and owner is not None and owner.parent == path.parent:
+            yield extension
+        parents = [part for part in path.parent.parts if part not in (path.anchor, ".", "..")]
+        for depth in range(1, len(parents) + 1):
+            yield "__".join(parents[-depth:] + [stem])
+        if extension:
+            yield extension
+        count = 2
+        while True:
+            yield f"{stem}_{count}"
+            count += 1
+
+
+class ReportWriter():
+
+    def __init__(
+        self,
+        filename: str,
+        fmt: str,
+        flush_every: int = REPORT_FLUSH_EVERY
+        ):
+
+        # Record formats append one record per document to a single file;
+        # the others write one report file per document.
+        self.fmt = fmt
+        if self.fmt not in REPORT_GENERATORS:
+            raise ValueError(f"Unsupported format.")
+        self.filename = filename
+        self.flush_every = flush_every
+        self.records = 0
+        self.file = None
+        self.names = DocumentNames()
+        if self.fmt in RECORD_WRITERS:
+            os.makedirs(REPORT_DIR, exist_ok=True)
+            path = os.path.join(REPORT_DIR, f"{filename}.{fmt}")
+            self.file = open(path, "w", newline="", encoding="utf-8")
+            if self.fmt in RECORD_HEADERS:
+                RECORD_HEADERS[self.fmt](self.file)
+
+    def write(
+        self,
+        analysis: dict,
+        document: str = None
+        ):
+
+        if self.file is None:
+            name = f"{self.names(document)}_{self.filename}" if document else self.filename
+            save_report(analysis, name, self.fmt)
+            return
+        RECORD_WRITERS[self.fmt](self.file, analysis, document)
+        self.records += 1
+        if self.records % self.flush_every == 0:
+            self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 def save_report(
     analysis: dict,
     filename: str,
@@ -57,5 +210,16 @@ def save_report(
 
 REPORT_GENERATORS = {
     "txt": generate_txt_report,
-    "md": generate_txt_report
+    "md": generate_txt_report,
+    "jsonl": generate_record_report,
+    "csv": generate_record_report
+}
+
+RECORD_WRITERS = {
+    "jsonl": write_jsonl_record,
+    "csv": write_csv_record
+}
+
+RECORD_HEADERS = {
+    "csv": write_csv_header
 }
\ No newline at end of file
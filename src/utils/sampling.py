@@ -0,0 +1,264 @@
+# src/utils/sampling.py
+
+import re
+from collections import Counter
+import numpy as np
+from config import SAMPLE_STRATUM_SIZE, SAMPLE_BOOTSTRAP, SAMPLE_CONFIDENCE
+from utils.report import flatten
+
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_units(text: str, unit: str = "paragraph") -> list:
+    # Paragraphs as Analyzer.split_paragraphs finds them; sentences are cut
+    # at end punctuation, since nothing is parsed before sampling.
+    paragraphs = [p for p in text.split("\n") if p.strip()]
+    if unit == "paragraph":
+        return paragraphs
+    if unit == "sentence":
+        return [s for p in paragraphs for s in SENTENCE_END_RE.split(p.strip()) if s]
+    raise ValueError(f"Unsupported sampling unit: {unit}")
+
+
+def sample_units(
+    texts,
+    fraction: float,
+    unit: str = "paragraph",
+    seed: int = None,
+    stratum_size: int = SAMPLE_STRATUM_SIZE
+    ):
+
+    # Strata are runs of stratum_size consecutive units of each text, so that
+    # the sample covers every text and every part of it. The sample sizes
+    # carry their rounding over from one stratum to the next, and add up to
+    # the fraction of all units.
+    rng = np.random.default_rng(seed)
+    units, strata, sizes = [], [], []
+    population = sampled = paragraphs = 0
+    for text in texts:
+        pieces = split_units(text, unit)
+        paragraphs += len(pieces) if unit == "paragraph" else len(split_units(text))
+        for start in range(0, len(pieces), stratum_size):
+            stratum = pieces[start:start + stratum_size]
+            population += len(stratum)
+            size = max(round(population * fraction) - sampled, 1)
+            size = min(size, len(stratum))
+            sampled += size
+            chosen = np.sort(rng.choice(len(stratum), size, replace=False))
+            units.extend(stratum[i] for i in chosen)
+            strata.extend([len(sizes)] * size)
+            sizes.append((len(stratum), size))
+    return units, np.array(strata, dtype=np.int64), sizes, paragraphs
+
+
+# Sets of the partials whose size is reported as a distinct count; these are
+# estimated rather than taken from the union over the sample.
+DISTINCT_COUNTS = {("text", "unique_words"): ("text", "unique_word_count")}
+
+
+def distinct_estimate(incidence, sampled: int, population: int) -> float:
+    # Chao & Lin (2012) lower bound of the number of distinct items in a
+    # population of units sampled without replacement, from the number of
+    # sampled units each item appears in. Exact for a full sample.
+    observed = np.count_nonzero(incidence)
+    q1 = np.count_nonzero(incidence == 1)
+    q2 = np.count_nonzero(incidence == 2)
+    q = sampled / population
+    if sampled < 2 or q >= 1 or not q1:
+        return float(observed)
+    k = sampled / (sampled - 1)
+    if q2:
+        return observed + q1 ** 2 / (k * 2 * q2 + q / (1 - q) * q1)
+    return observed + q1 * (q1 - 1) / (k * 2 + q / (1 - q) * q1)
+
+
+def numeric_leaves(partial, prefix=()):
+    if isinstance(partial, dict):
+        for key, value in partial.items():
+            yield from numeric_leaves(value, prefix + (key,))
+    elif isinstance(partial, (int, float)) and not isinstance(partial, bool):
+        yield prefix, partial
+
+
+class SampleEstimator():
+
+    def __init__(
+        self,
+        modules: dict,
+        partials: list,
+        strata,
+        sizes: list,
+        seed: int = None,
+        known: dict = None
+        ):
+
+        # A sparse matrix, as coordinate arrays, with one row per sampled unit
+        # and one column per numeric leaf of its partials, Counter entries
+        # included; each unit stands for N_h / n_h units of its stratum.
+        self.modules = modules
+        self.strata = strata
+        self.sizes = sizes
+        self.rng = np.random.default_rng(seed)
+        # Totals counted exactly while sampling, such as the paragraphs, are
+        # used as they are.
+        self.known = known or {}
+        self.templates = {}
+        self.sets = {}
+        self.incidence = {}
+        self.columns = {}
+        rows, cols, values = [], [], []
+        for i, unit in enumerate(partials):
+            for name, partial in unit.items():
+                self.templates.setdefault(name, partial)
+                for path, value in numeric_leaves(partial, (name,)):
+                    rows.append(i)
+                    cols.append(self.columns.setdefault(path, len(self.columns)))
+                    values.append(value)
+                self.collect_sets(partial, (name,), i)
+        self.items = {}
+        for prefix, pairs in self.incidence.items():
+            if not pairs:
+                continue
+            units, members = zip(*pairs)
+            _, items = np.unique(members, return_inverse=True)
+            self.items[prefix] = (np.array(units, dtype=np.int64), items)
+        self.population = int(sum(size[0] for size in sizes))
+        self.rows = np.array(rows, dtype=np.int64)
+        self.cols = np.array(cols, dtype=np.int64)
+        self.values = np.array(values, dtype=np.float64)
+        population = np.array([size[0] for size in sizes], dtype=np.float64)
+        sample = np.array([size[1] for size in sizes], dtype=np.float64)
+        self.weights = (population / sample)[strata] if len(strata) else np.zeros(0)
+
+    def collect_sets(self, partial, prefix, row):
+        # Sets, such as the distinct words, are the union over the sample;
+        # the units each item appears in are kept for distinct counts.
+        if isinstance(partial, dict) and not isinstance(partial, Counter):
+            for key, value in partial.items():
+                self.collect_sets(value, prefix + (key,), row)
+        elif isinstance(partial, (set, frozenset)):
+            self.sets.setdefault(prefix, set()).update(partial)
+            if prefix in DISTINCT_COUNTS:
+                self.incidence.setdefault(prefix, []).extend((row, item) for item in partial)
+
+    def distinct_counts(self, drawn) -> dict:
+        # From the distinct units drawn: a bootstrap replicate is then a
+        # smaller sample without replacement, which the estimator allows for.
+        # Each count comes with the number of items observed.
+        counts = {}
+        sampled = int(np.count_nonzero(drawn))
+        for prefix, (rows, items) in self.items.items():
+            incidence = np.bincount(items, weights=drawn[rows] > 0)
+            counts[DISTINCT_COUNTS[prefix]] = (
+                int(np.count_nonzero(incidence)),
+                distinct_estimate(incidence, sampled, self.population)
+            )
+        return counts
+
+    def rebuild(self, template, totals: dict, prefix: tuple):
+        if isinstance(template, Counter):
+            return Counter({
+                path[-1]: round(value) for path, value in totals.items()
+                if path[:-1] == prefix and value
+            })
+        if isinstance(template, dict):
+            return {key: self.rebuild(value, totals, prefix + (key,)) for key, value in template.items()}
+        if isinstance(template, (set, frozenset)):
+            return self.sets.get(prefix, set())
+        if isinstance(template, list):
+            # Per-sentence details are not estimated.
+            return []
+        if isinstance(template, bool) or prefix not in totals:
+            return template
+        return round(totals[prefix]) if isinstance(template, int) else totals[prefix]
+
+    def analysis(self, drawn, columns, entries=slice(None)) -> dict:
+        # `drawn` is the number of times each sampled unit is drawn: once for
+        # the point estimate, any number in a bootstrap replicate.
+        weights = drawn * self.weights
+        sums = np.bincount(
+            self.cols[entries],
+            weights=self.values[entries] * weights[self.rows[entries]],
+            minlength=len(self.columns)
+        )
+        totals = {path: float(sums[self.columns[path]]) for path in columns}
+        totals.update((path, value) for path, value in self.known.items() if path in totals)
+        return {
+            name: module.finalize(self.rebuild(self.templates[name], totals, (name,)))
+            for name, module in self.modules.items()
+            if name in self.templates
+        }
+
+    def replicates(self, n: int):
+        # Stratified bootstrap: each replicate draws n_h units with
+        # replacement within every stratum.
+        starts = np.searchsorted(self.strata, self.strata, side="left")
+        ends = np.searchsorted(self.strata, self.strata, side="right")
+        for _ in range(n):
+            draws = self.rng.integers(starts, ends)
+            yield np.bincount(draws, minlength=len(self.strata)).astype(np.float64)
+
+    def estimate(
+        self,
+        bootstrap: int = SAMPLE_BOOTSTRAP,
+        confidence: float = SAMPLE_CONFIDENCE
+        ) -> dict:
+
+        drawn = np.ones(len(self.strata))
+        point = self.analysis(drawn, list(self.columns))
+        distinct = {
+            path: counts for path, counts in self.distinct_counts(drawn).items()
+            if path[1] in point.get(path[0], {})
+        }
+        for (name, key), (_, count) in distinct.items():
+            point[name][key] = round(count)
+        # Replicates only need the Counter entries that are reported, e.g.
+        # the top words, besides the plain totals.
+        columns = [
+            path for path in self.columns
+            if len(path) == 2 or path[-1] in point.get(path[0], {})
+        ]
+        entries = np.isin(self.cols, [self.columns[path] for path in columns])
+        samples = {}
+        unseen = {}
+        for drawn in self.replicates(bootstrap):
+            try:
+                replicate = self.analysis(drawn, columns, entries)
+            except ZeroDivisionError:
+                continue
+            for path, (observed, count) in self.distinct_counts(drawn).items():
+                if path in distinct:
+                    unseen.setdefault(path, []).append(count - observed)
+            for name in point:
+                for path, value in flatten(replicate.get(name, {}), name):
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        samples.setdefault(path, []).append(value)
+        alpha = (1 - confidence) / 2
+        intervals = {}
+        for path, value in flatten(point):
+            if path in samples:
+                low, high = np.quantile(samples[path], [alpha, 1 - alpha])
+                intervals[path] = [round(float(low), 3), round(float(high), 3)]
+        # A replicate holds fewer distinct units than the sample, and its
+        # estimate of the unseen items is lower: only the spread of the
+        # replicates, relative to their mean, is applied to the sample's.
+        for (name, key), (observed, count) in distinct.items():
+            extra = np.asarray(unseen.get((name, key), [0.0]))
+            mean = extra.mean()
+            scale = extra / mean if mean > 0 else np.ones(1)
+            low, high = observed + (count - observed) * np.quantile(scale, [alpha, 1 - alpha])
+            intervals[f"{name}.{key}"] = [round(float(low), 3), round(float(high), 3)]
+        point["sample"] = {
+            "units": len(self.strata),
+            "population": self.population,
+            "strata": len(self.sizes),
+            "bootstrap": bootstrap,
+            "confidence": confidence,
+            "intervals": intervals,
+            # Distinct counts are extrapolated from these counts in the sample.
+            "observed": {
+                ".".join(DISTINCT_COUNTS[prefix]): len(self.sets[prefix])
+                for prefix in self.items
+            }
+        }
+        return point
@@ -0,0 +1,67 @@
+# src/utils/sketch.py
+
+import heapq
+from collections import Counter
+from operator import itemgetter
+
+
+class SpaceSaving():
+
+    def __init__(
+        self,
+        capacity: int,
+        counts=None,
+        errors=None
+        ):
+        if capacity < 1:
+            raise ValueError("The sketch capacity must be at least 1")
+        self.capacity = capacity
+        self.counts = Counter(counts or {})
+        self.errors = Counter(errors or {})
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @property
+    def floor(self) -> int:
+        # No item left out of a full sketch occurred more often than this.
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def update(self, counts: dict):
+        # Exact counts, e.g. those of one document.
+        self.combine(counts, {}, 0)
+        return self
+
+    def merge(self, other):
+        self.combine(other.counts, other.errors, other.floor)
+        return self
+
+    def combine(self, counts, errors, floor):
+        # An item missing from one side may have occurred up to that side's
+        # floor times there, which is added to both its count and its error.
+        own_floor = self.floor
+        merged = {}
+        for item, count in self.counts.items():
+            if item in counts:
+                merged[item] = (count + counts[item], self.errors[item] + errors.get(item, 0))
+            else:
+                merged[item] = (count + floor, self.errors[item] + floor)
+        for item, count in counts.items():
+            if item not in merged:
+                merged[item] = (count + own_floor, errors.get(item, 0) + own_floor)
+        if len(merged) > self.capacity:
+            merged = dict(heapq.nlargest(
+                self.capacity,
+                merged.items(),
+                key=lambda item: item[1][0]
+            ))
+        self.counts = Counter({item: count for item, (count, _) in merged.items()})
+        self.errors = Counter({item: error for item, (_, error) in merged.items()})
+
+    def most_common(self, n: int = None) -> list:
+        return [
+            (item, count, self.errors[item])
+            for item, count in sorted(self.counts.items(), key=itemgetter(1), reverse=True)[:n]
+        ]
@@ -0,0 +1,45 @@
+# src/utils/syllables.py
+
+import re
+from functools import lru_cache
+from config import SYLLABLE_CACHE_SIZE
+
+
+VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+
+# Suffixes that do not add a syllable, unless the stem ends with one of the
+# given letters ("jumped" vs "wanted", "makes" vs "boxes").
+SILENT_SUFFIXES = (
+    ("ed", ("t", "d")),
+    ("es", ("s", "x", "z", "ch", "sh", "c", "g")),
+)
+
+# Suffixes ignored when deciding whether a word is complex (Gunning fog).
+INFLECTIONS = ("es", "ed", "ing")
+
+
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
+def count_syllables(word: str) -> int:
+    count = len(VOWEL_GROUPS.findall(word))
+    if count > 1:
+        for suffix, voiced in SILENT_SUFFIXES:
+            if word.endswith(suffix):
+                if not word[:-len(suffix)].endswith(voiced):
+                    count -= 1
+                break
+        else:
+            if word.endswith("e") and not word.endswith(("le", "ee", "ye")):
+                count -= 1
+            elif word.endswith("le") and word[-3:-2] in "aeiouy":
+                count -= 1
+    return max(1, count)
+
+
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
+def is_complex_word(word: str) -> bool:
+    if count_syllables(word) < 3:
+        return False
+    for suffix in INFLECTIONS:
+        if word.endswith(suffix) and len(word) > len(suffix) + 2:
+            return count_syllables(word[:-len(suffix)]) >= 3
+    return True
@@ -0,0 +1,172 @@
+# src/utils/timings.py
+
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class Timings():
+
+    def __init__(self, trace_memory=False):
+        self.phases = {}
+        self.documents = 0
+        self.tokens = 0
+        self.trace_memory = trace_memory
+        self._stack = []
+        self._nested = []
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        # tracemalloc slows down every allocation, imports and model loading
+        # the most, so traced memory is opt-in; the growth of the peak RSS is
+        # recorded either way.
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name):
+        # Wall and CPU time are exclusive: a phase entered inside another,
+        # such as loading the files that the parser pulls, is subtracted from
+        # the outer one, so that the phases add up to at most the total.
+        # tracemalloc has a single peak counter: it is reset for each phase,
+        # and the peaks of inner phases are carried over to the outer one.
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            self._stack.append({"start": current, "peak": current})
+        rss = peak_rss()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        self._nested.append([0.0, 0.0])
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            inner_wall, inner_cpu = self._nested.pop()
+            if self._nested:
+                self._nested[-1][0] += wall
+                self._nested[-1][1] += cpu
+            rss = None if rss is None else peak_rss() - rss
+            memory = None
+            if self.trace_memory:
+                frame = self._stack.pop()
+                peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                if self._stack:
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+                memory = peak - frame["start"]
+            self.record(name, wall - inner_wall, cpu - inner_cpu, memory, rss)
+
+    def record(self, name, wall, cpu, memory=None, rss_growth=None):
+        stats = self.phases.setdefault(name, {
+            "calls": 0,
+            "wall": 0.0,
+            "cpu": 0.0,
+            "memory_peak": None,
+            "rss_growth": None,
+            "peak_rss": None
+        })
+        stats["calls"] += 1
+        stats["wall"] += wall
+        stats["cpu"] += cpu
+        if memory is not None:
+            stats["memory_peak"] = max(stats["memory_peak"] or 0, memory)
+        if rss_growth is not None:
+            stats["rss_growth"] = (stats["rss_growth"] or 0) + rss_growth
+        stats["peak_rss"] = peak_rss()
+
+    def count(self, documents=0, tokens=0):
+        self.documents += documents
+        self.tokens += tokens
+
+    def summary(self) -> dict:
+        wall = time.perf_counter() - self._started
+        parse = self.phases.get("parse", {}).get("wall", 0.0)
+        return {
+            "phases": self.phases,
+            "total": {
+                "wall": wall,
+                "cpu": time.process_time() - self._cpu_started,
+                "peak_rss": peak_rss()
+            },
+            "documents": self.documents,
+            "tokens": self.tokens,
+            "throughput": {
+                "docs_per_sec": self.documents / wall if wall else None,
+                "tokens_per_sec": self.tokens / wall if wall else None,
+                "parse_tokens_per_sec": self.tokens / parse if parse else None
+            }
+        }
+
+    def format_table(self) -> str:
+        summary = self.summary()
+        headers = ["phase", "calls", "wall (s)", "cpu (s)", "memory peak (MB)", "rss growth (MB)", "peak rss (MB)"]
+        rows = [
+            [
+                name,
+                stats["calls"],
+                round(stats["wall"], 4),
+                round(stats["cpu"], 4),
+                to_megabytes(stats["memory_peak"]),
+                to_megabytes(stats["rss_growth"]),
+                to_megabytes(stats["peak_rss"])
+            ]
+            for name, stats in summary["phases"].items()
+        ]
+        total = summary["total"]
+        rows.append([
+            "total", "", round(total["wall"], 4), round(total["cpu"], 4), "", "",
+            to_megabytes(total["peak_rss"])
+        ])
+        from tabulate import tabulate
+        lines = [tabulate(rows, headers=headers, tablefmt="github")]
+        throughput = summary["throughput"]
+        lines.append(f"\ndocuments: {summary['documents']}, tokens: {summary['tokens']}")
+        if throughput["docs_per_sec"]:
+            lines.append(f"docs/sec: {throughput['docs_per_sec']:.2f}")
+            lines.append(f"tokens/sec: {throughput['tokens_per_sec']:.0f}")
+        if throughput["parse_tokens_per_sec"]:
+            lines.append(f"parse tokens/sec: {throughput['parse_tokens_per_sec']:.0f}")
+        return "\n".join(lines)
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+def to_megabytes(size):
+    return "" if size is None else round(size / (1024 * 1024), 2)
+
+
+def phase(timings, name):
+    return nullcontext() if timings is None else timings.phase(name)
+
+
+def iter_phase(timings, name, iterable):
+    # Times the wait for each item of a lazily produced sequence.
+    iterator = iter(iterable)
+    while True:
+        with phase(timings, name):
+            item = next(iterator, _END)
+        if item is _END:
+            return
+        yield item
+
+
+_END = object()
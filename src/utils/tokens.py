@@ -0,0 +1,59 @@
+# src/utils/tokens.py
+
+import numpy as np
+from spacy.attrs import ORTH, LOWER, LEMMA, POS, IS_ALPHA, IS_STOP, IS_SPACE, LENGTH
+
+
+COLUMNS = {
+    "orth": ORTH,
+    "lower": LOWER,
+    "lemma": LEMMA,
+    "pos": POS,
+    "is_alpha": IS_ALPHA,
+    "is_stop": IS_STOP,
+    "is_space": IS_SPACE,
+    "length": LENGTH
+}
+
+
+class TokenTable():
+
+    def __init__(self, doc):
+        # One uint64 column per attribute, taken from the Doc in a single
+        # call; strings are only looked up for the values that are reported.
+        self.strings = doc.vocab.strings
+        self.array = doc.to_array(list(COLUMNS.values())).reshape(len(doc), len(COLUMNS))
+        for i, name in enumerate(COLUMNS):
+            setattr(self, name, self.array[:, i])
+        self.alpha = self.is_alpha.astype(bool)
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def decode(self, values) -> list:
+        return [self.strings[int(value)] for value in values]
+
+    def count(self, column: str, mask=None):
+        values = getattr(self, column)
+        if mask is not None:
+            values = values[mask]
+        uniques, first, counts = np.unique(values, return_index=True, return_counts=True)
+        return uniques, first, counts
+
+    def counts(self, column: str, mask=None) -> dict:
+        # In order of first occurrence, as a Counter built token by token.
+        uniques, first, counts = self.count(column, mask)
+        order = np.argsort(first, kind="stable")
+        return dict(zip(self.decode(uniques[order]), counts[order].tolist()))
+
+    def most_common(
+        self,
+        column: str,
+        n: int = None,
+        mask=None
+        ) -> list:
+
+        # Ties are broken by first occurrence, as in Counter.most_common.
+        uniques, first, counts = self.count(column, mask)
+        order = np.lexsort((first, -counts.astype(np.int64)))[:n]
+        return list(zip(self.decode(uniques[order]), counts[order].tolist()))
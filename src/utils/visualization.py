@@ -1,6 +1,17 @@
 # src/utils/visualization.py
 
-import matplotlib.pyplot as plt
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from config import REPORT_DIR, PLOT_WORKERS, PLOT_TOP_N
+from utils.report import DocumentNames
+
+PLOT_TITLES = {
+    "words": "Top Word Frequencies",
+    "pos": "POS Frequencies"
+}
 
 
 def print_table(
@@ -28,13 +39,130 @@ def save_plot(
     title="freqs",
     color="skyblue"
     ):
-    items = [item for item, _, _ in data]
-    counts = [count for _, count, _ in data]
-    plt.figure(figsize=(10,6))
-    plt.bar(items, counts, color=color)
-    plt.xticks(rotation=45)
-    plt.ylabel("Count")
-    plt.title(title)
-    plt.tight_layout()
-    plt.savefig(filename)
-    plt.close()
\ No newline at end of file
+    get_renderer().render(data, filename, title, color)
+
+
+class FigureRenderer():
+
+    def __init__(self, figsize=(10, 6)):
+        # A single Agg figure, without pyplot's global state, that is cleared
+        # and drawn again for every chart.
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        self.figure = Figure(figsize=figsize)
+        FigureCanvasAgg(self.figure)
+        self.axes = self.figure.add_subplot()
+
+    def render(
+        self,
+        data,
+        filename="plot.png",
+        title="freqs",
+        color="skyblue"
+        ):
+        items = [item for item, _, _ in data]
+        counts = [count for _, count, _ in data]
+        self.axes.clear()
+        self.axes.bar(items, counts, color=color)
+        self.axes.tick_params(axis="x", labelrotation=45)
+        self.axes.set_ylabel("Count")
+        self.axes.set_title(title)
+        self.figure.tight_layout()
+        self.figure.savefig(filename)
+
+
+_RENDERER = None
+
+def get_renderer() -> FigureRenderer:
+    # One figure per process, worker processes included.
+    global _RENDERER
+    if _RENDERER is None:
+        _RENDERER = FigureRenderer()
+    return _RENDERER
+
+
+def freq_data(stats: dict) -> list:
+    data = [(item, values["count"], values["freq"]) for item, values in stats.items()]
+    return sorted(data, key=lambda item: item[1], reverse=True)
+
+
+def render_charts(charts) -> list:
+    renderer = get_renderer()
+    for data, filename, title in charts:
+        renderer.render(data, filename, title)
+    return [filename for _, filename, _ in charts]
+
+
+class PlotWriter():
+
+    def __init__(
+        self,
+        filename: str = "report",
+        max_workers: int = PLOT_WORKERS,
+        max_pending: int = None
+        ):
+
+        # Charts of the first document are drawn in this process; later ones
+        # go to worker processes when more than one is allowed.
+        self.filename = filename
+        self.max_workers = max_workers
+        self.max_pending = max_pending or max_workers * 4
+        self.pool = None
+        self.pending = deque()
+        self.documents = 0
+        self.files = []
+        self.names = DocumentNames()
+
+    def charts(
+        self,
+        analysis: dict,
+        document: str = None
+        ) -> list:
+
+        name = f"{self.names(document)}_{self.filename}" if document else self.filename
+        label = f" ({Path(document).name})" if document else ""
+        return [
+            (
+                freq_data(analysis[module])[:PLOT_TOP_N],
+                os.path.join(REPORT_DIR, f"{name}_{module}.png"),
+                f"{title}{label}"
+            )
+            for module, title in PLOT_TITLES.items()
+            if analysis.get(module)
+        ]
+
+    def write(
+        self,
+        analysis: dict,
+        document: str = None
+        ):
+
+        charts = self.charts(analysis, document)
+        if not charts:
+            return
+        os.makedirs(REPORT_DIR, exist_ok=True)
+        self.documents += 1
+        if self.documents == 1 or self.max_workers <= 1:
+            self.files.extend(render_charts(charts))
+            return
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.max_workers, mp_context=get_context("spawn"))
+        self.pending.append(self.pool.submit(render_charts, charts))
+        # Bounded, so that charts are not queued faster than they are drawn.
+        while len(self.pending) > self.max_pending:
+            self.files.extend(self.pending.popleft().result())
+
+    def close(self):
+        try:
+            while self.pending:
+                self.files.extend(self.pending.popleft().result())
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
+                self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
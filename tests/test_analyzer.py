@@ -1,5 +1,7 @@
+import tracemalloc
 import pytest
-from src.analyzer import Analyzer
+from src.analyzer import Analyzer, analyze_corpus, analyze_stream, load_spacy_model
+from src.utils.chunk import iter_chunks
 
 
 sample_text = "Blessed is he who, in the name of charity and good will, shepherds the weak through the valley of the darkness."
@@ -40,4 +42,93 @@ def test_generate_analysis():
     assert result["text"]["sentences_per_paragraph"] == 1.0
     assert result["text"]["sentence_count"] == 1
     assert result["text"]["words_per_sentence"] == 21.0
-    assert result["text"]["unique_word_count"] == 17
\ No newline at end of file
+    assert result["text"]["unique_word_count"] == 17
+
+def test_load_spacy_model_is_cached():
+    assert load_spacy_model() is load_spacy_model()
+
+def test_focus_excludes_unused_pipes():
+    focused = Analyzer(sample_text, focus=["pos"])
+    assert "tagger" in focused.nlp.pipe_names
+    assert "attribute_ruler" in focused.nlp.pipe_names
+    assert "ner" not in focused.nlp.pipe_names
+    assert "parser" not in focused.nlp.pipe_names
+
+def test_focus_shares_model():
+    assert Analyzer("One.", focus=["words"]).nlp is Analyzer("Two.", focus=["words"]).nlp
+
+def test_analyze_corpus_keeps_input_order():
+    texts = ["The first document.", sample_text, "A third, shorter one."]
+    analyzers = list(analyze_corpus(texts, ["text"], batch_size=2))
+    assert [a.get_text() for a in analyzers] == texts
+    assert analyzers[1].analysis["text"]["word_count"] == 21
+
+def test_analyze_corpus_multiprocess():
+    texts = [f"Document number {i} is here." for i in range(6)]
+    analyzers = list(analyze_corpus(texts, ["words"], batch_size=2, n_process=2))
+    assert [a.get_text() for a in analyzers] == texts
+
+def test_analyze_stream_matches_single_pass():
+    text = "\n".join([sample_text, "The valley is quiet.", "", "Good will prevails. It always does!"])
+    focus = ["text", "words", "read", "sent"]
+    single = Analyzer(text, focus)
+    single.plug_modules(focus)
+    expected = single.generate_analysis()
+    assert analyze_stream(iter_chunks(text, chunk_size=120), focus) == expected
+
+def test_analyze_stream_pos_counts():
+    text = "\n".join([sample_text, "The valley is quiet."])
+    result = analyze_stream(iter_chunks(text, chunk_size=120), ["pos"])
+    assert sum(stats["count"] for stats in result["pos"].values()) == 25
+
+def test_analyze_stream_splits_long_lines():
+    text = "\n".join([sample_text, "", sample_text])
+    result = analyze_stream(iter_chunks(text, chunk_size=40), ["text"])["text"]
+    assert result["paragraph_count"] == 2
+    assert result["character_count"] == len(text)
+    assert result["word_count"] == 42
+    assert result["unique_word_count"] == 17
+
+def test_inputs_computed_once(monkeypatch):
+    shared = Analyzer(sample_text, ["text", "read", "sent"])
+    calls = []
+    split_sentences = Analyzer.split_sentences
+    monkeypatch.setattr(Analyzer, "split_sentences", lambda self: calls.append(1) or split_sentences(self))
+    shared.plug_modules(["text", "read", "sent"])
+    shared.generate_analysis()
+    assert len(calls) == 1
+
+def test_run_modules_concurrent_matches_serial():
+    focus = ["text", "words", "pos", "read", "sent"]
+    results = []
+    for workers in (1, 4):
+        a = Analyzer(sample_text, focus)
+        a.plug_modules(focus)
+        results.append(a.run_modules("analyze", max_workers=workers))
+    assert results[0] == results[1]
+    assert list(results[1]) == focus
+
+def test_slots():
+    a = Analyzer(sample_text, ["words"])
+    a.plug_modules(["words", "read"])
+    assert not hasattr(a, "__dict__")
+    assert not any(hasattr(module, "__dict__") for module in a.modules)
+
+FOCUS = ["text", "words", "pos", "read", "sent"]
+
+def retained_memory(lean):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        a = Analyzer(sample_text * 20, FOCUS, lean=lean)
+        a.plug_modules(FOCUS)
+        analysis = a.generate_analysis()
+        return tracemalloc.get_traced_memory()[0] - before, analysis
+    finally:
+        tracemalloc.stop()
+
+def test_lean_releases_inputs():
+    full, full_analysis = retained_memory(False)
+    lean, lean_analysis = retained_memory(True)
+    assert lean_analysis == full_analysis
+    assert lean < full / 2
@@ -0,0 +1,56 @@
+import pytest
+from benchmarks.corpus import generate_text, write_corpus
+from benchmarks.run import MODULE_MAP, benchmark_corpus, compare, parse_tolerances
+from src.utils.load import load_file
+
+
+baseline = {"results": {"txt/1KB": {"parse": 1.0, "module.sent": 0.5, "characters": 1024}}}
+
+
+def test_generate_text_deterministic():
+    assert generate_text(2048, seed=1) == generate_text(2048, seed=1)
+    assert generate_text(2048, seed=1) != generate_text(2048, seed=2)
+    assert len(generate_text(2048)) >= 2048
+
+@pytest.mark.parametrize("fmt", ["txt", "docx", "pdf"])
+def test_write_corpus_roundtrip(tmp_path, fmt):
+    path = write_corpus(tmp_path, "1KB", fmt)
+    words = load_file(str(path)).split()
+    assert words[:5] == generate_text(1024).split()[:5]
+    assert len(words) == len(generate_text(1024).split())
+
+def test_compare_regression():
+    current = {"results": {"txt/1KB": {"parse": 1.5, "module.sent": 0.55, "characters": 1024}}}
+    regressions = compare(current, baseline, tolerance=0.25)
+    assert [r["phase"] for r in regressions] == ["parse"]
+
+def test_compare_phase_tolerance():
+    current = {"results": {"txt/1KB": {"parse": 1.5, "module.sent": 0.55, "characters": 1024}}}
+    assert compare(current, baseline, tolerance=0.25, tolerances=parse_tolerances(["parse=0.6"])) == []
+
+def test_compare_noise_floor():
+    small = {"results": {"txt/1KB": {"parse": 0.001}}}
+    assert compare({"results": {"txt/1KB": {"parse": 0.003}}}, small) == []
+
+@pytest.mark.parametrize("max_length, method", [(1_000_000, "analyze"), (500, "partial")])
+def test_benchmark_times_the_default_path(tmp_path, monkeypatch, max_length, method):
+    import analyzer
+    path = write_corpus(tmp_path, "1KB", "txt")
+    load = analyzer.load_spacy_model
+
+    def load_spacy_model(*args, **kwargs):
+        nlp = load(*args, **kwargs)
+        monkeypatch.setattr(nlp, "max_length", max_length)
+        return nlp
+
+    monkeypatch.setattr(analyzer, "load_spacy_model", load_spacy_model)
+    calls = []
+    module = MODULE_MAP["words"]
+    for name in ("analyze", "partial"):
+        original = getattr(module, name)
+        monkeypatch.setattr(module, name, lambda self, name=name, original=original: calls.append(name) or original(self))
+    monkeypatch.chdir(tmp_path)
+    timings = benchmark_corpus(path, ["text", "words"], chunk_size=400)
+    assert {"load_files", "model_load", "parse", "module.text", "module.words", "save_report"} <= set(timings)
+    assert set(calls) == {method}
+    assert (len(calls) == 1) == (method == "analyze")
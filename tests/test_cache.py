@@ -0,0 +1,90 @@
+import os
+import pytest
+from src.analyzer import Analyzer, analyze_corpus, load_spacy_model
+from src.utils.cache import DocCache
+
+
+sample_text = "Blessed is he who, in the name of charity and good will, shepherds the weak through the valley of the darkness."
+
+nlp = load_spacy_model()
+
+
+def test_roundtrip(tmp_path):
+    cache = DocCache(tmp_path)
+    doc = nlp(sample_text)
+    key = cache.key(sample_text, nlp)
+    assert cache.get(key, nlp) is None
+    cache.put(key, doc)
+    cached = cache.get(key, nlp)
+    assert cached.text == sample_text
+    assert [t.pos_ for t in cached] == [t.pos_ for t in doc]
+    assert [s.text for s in cached.sents] == [s.text for s in doc.sents]
+
+def test_key_depends_on_pipes(tmp_path):
+    cache = DocCache(tmp_path)
+    trimmed = load_spacy_model(pipes=[])
+    assert cache.key(sample_text, nlp) != cache.key(sample_text, trimmed)
+
+def test_eviction(tmp_path):
+    cache = DocCache(tmp_path, max_size=1)
+    key = cache.key(sample_text, nlp)
+    cache.put(key, nlp(sample_text))
+    assert not cache.contains(key)
+    assert cache.size == 0
+
+def test_put_keeps_running_size(tmp_path, monkeypatch):
+    texts = [f"Text number {i}." for i in range(5)]
+    docs = [nlp(text) for text in texts]
+    cache = DocCache(tmp_path)
+    cache.put(cache.key(texts[0], nlp), docs[0])
+    scans = []
+    monkeypatch.setattr(cache, "scan", lambda: scans.append(1))
+    for text, doc in zip(texts, docs):
+        cache.put(cache.key(text, nlp), doc)
+    assert not scans
+    assert cache.size == sum(path.stat().st_size for path in tmp_path.glob("*.spacy"))
+
+def test_evicts_oldest_below_max_size(tmp_path):
+    texts = [f"Text number {i}." for i in range(4)]
+    cache = DocCache(tmp_path)
+    keys = [cache.key(text, nlp) for text in texts]
+    cache.put(keys[0], nlp(texts[0]))
+    cache.max_size = cache.size * 3
+    for i, (key, text) in enumerate(zip(keys[1:], texts[1:]), 1):
+        os.utime(cache.path(keys[i - 1]), (i, i))
+        cache.put(key, nlp(text))
+    # Down to 90% of max_size: two entries of three fit.
+    assert [cache.contains(key) for key in keys] == [False, False, True, True]
+    assert cache.size <= cache.max_size * 0.9
+
+def test_analyzer_uses_cache(tmp_path):
+    cache = DocCache(tmp_path)
+    first = Analyzer(sample_text, cache=cache)
+    assert cache.contains(cache.key(sample_text, nlp))
+    second = Analyzer(sample_text, cache=cache)
+    assert second.get_words() == first.get_words()
+    assert second.get_sentences() == first.get_sentences()
+
+def test_analyze_corpus_with_cache(tmp_path):
+    cache = DocCache(tmp_path)
+    texts = ["A first text.", sample_text]
+    Analyzer(sample_text, ["text"], cache=cache)
+    analyzers = list(analyze_corpus(texts, ["text"], cache=cache))
+    assert [a.get_text() for a in analyzers] == texts
+    assert analyzers[1].analysis["text"]["word_count"] == 21
+
+def test_analyze_corpus_with_cache_streams(tmp_path):
+    cache = DocCache(tmp_path)
+    Analyzer("Text 1 here.", ["text"], cache=cache)
+    events = []
+
+    def texts():
+        for i in range(5):
+            events.append(("load", i))
+            yield f"Text {i} here."
+
+    for i, analyzer in enumerate(analyze_corpus(texts(), ["text"], batch_size=2, cache=cache)):
+        events.append(("analyzed", i))
+        assert analyzer.get_text() == f"Text {i} here."
+    assert events.index(("analyzed", 0)) < events.index(("load", 2))
+    assert events.index(("analyzed", 2)) < events.index(("load", 4))
@@ -0,0 +1,37 @@
+import pytest
+from src.utils.chunk import iter_chunks, join_texts
+
+
+sample_text = "First paragraph here.\nSecond one, a little longer.\n\nThird after a blank line.\nLast."
+
+
+def test_iter_chunks_roundtrip():
+    chunks = list(iter_chunks(sample_text, chunk_size=30))
+    assert "".join(chunks) == sample_text
+    assert all(len(chunk) <= 30 for chunk in chunks)
+
+def test_iter_chunks_cut_after_newline():
+    chunks = list(iter_chunks(sample_text, chunk_size=30))
+    assert all(chunk.endswith("\n") for chunk in chunks[:-1])
+
+def test_iter_chunks_long_line():
+    text = "word " * 20
+    chunks = list(iter_chunks(text, chunk_size=12))
+    assert "".join(chunks) == text
+    assert all(chunk.endswith(" ") for chunk in chunks)
+
+def test_iter_chunks_pieces():
+    pieces = ["ab", "c\nde", "f\n", "g"]
+    assert "".join(iter_chunks(pieces, chunk_size=4)) == "abc\ndef\ng"
+
+def test_join_texts():
+    assert "".join(join_texts(["a", "b", "c"])) == "a\n\nb\n\nc"
+
+def test_join_texts_pieces():
+    assert "".join(join_texts([iter(["a", "b"]), "c"])) == "ab\n\nc"
+
+def test_iter_chunks_large_piece():
+    text = "Some words here.\n" * 1000
+    chunks = list(iter_chunks([text, text], chunk_size=100))
+    assert "".join(chunks) == text + text
+    assert all(len(chunk) <= 100 for chunk in chunks)
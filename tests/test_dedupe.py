@@ -0,0 +1,40 @@
+import random
+import numpy as np
+from src.utils.dedupe import NearDuplicates, optimal_bands, shingle_hashes
+
+
+random.seed(0)
+words = [f"word{random.randint(0, 1000)}" for _ in range(1500)]
+text = " ".join(words)
+
+def test_shingles_ignore_case_and_spacing():
+    assert np.array_equal(shingle_hashes(text), shingle_hashes("  \n".join(words).upper()))
+    assert len(shingle_hashes("one two", size=5)) == 1
+    assert len(shingle_hashes("")) == 0
+
+def test_optimal_bands():
+    bands, rows = optimal_bands(0.9, 128)
+    assert bands * rows <= 128
+    assert 0.8 < (1 / bands) ** (1 / rows) < 0.95
+
+def test_groups_near_duplicates():
+    detector = NearDuplicates(0.8)
+    edited = words[:]
+    for i in range(100, 1500, 150):
+        edited[i] = "edited"
+    assert detector.add("a", text) is None
+    assert detector.add("b", "The cat sat on the mat.") is None
+    assert detector.add("c", text) == {"of": "a", "similarity": 1.0}
+    near = detector.add("d", " ".join(edited))
+    assert near["of"] == "a" and 0.8 <= near["similarity"] < 1.0
+    assert detector.add("e", " ".join(words[:700])) is None
+    assert list(detector.signatures) == ["a", "b", "e"]
+
+def test_similarity_estimate():
+    detector = NearDuplicates(0.5, num_perm=256)
+    first = " ".join(words[:1000])
+    second = " ".join(words[500:1500])
+    a, b = shingle_hashes(first), shingle_hashes(second)
+    jaccard = len(np.intersect1d(a, b)) / len(np.union1d(a, b))
+    estimate = np.mean(detector.signature(first) == detector.signature(second))
+    assert abs(estimate - jaccard) < 0.1
@@ -0,0 +1,64 @@
+import os
+import pytest
+from collections import Counter
+from src.analyzer import analyze_stream, index_partials, finalize_partials, plug_aggregators
+from src.utils.index import CorpusIndex, from_json, to_json
+import json
+
+
+partials = {
+    "words": {"counts": Counter({"good": 2, "day": 1}), "total": 3},
+    "text": {"unique_words": {"good", "day"}, "head": True},
+    "sent": {"sentences": [("Good day.", 0.7, 0.6)]}
+}
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    for i, text in enumerate(["A good day.", "A terrible night.\nStill dark.", "Nothing else."]):
+        (tmp_path / f"doc_{i}.txt").write_text(text)
+    return tmp_path
+
+
+def test_json_roundtrip():
+    decoded = json.loads(json.dumps(to_json(partials)), object_hook=from_json)
+    assert decoded["words"]["counts"] == partials["words"]["counts"]
+    assert isinstance(decoded["words"]["counts"], Counter)
+    assert decoded["text"]["unique_words"] == {"good", "day"}
+
+def test_get_put(corpus):
+    index = CorpusIndex(corpus / "index.json")
+    path = corpus / "doc_0.txt"
+    assert index.get(path, ["words"]) is None
+    index.put(path, partials)
+    assert index.get(path, ["words"]) == {"words": partials["words"]}
+    assert index.get(path, ["pos"]) is None
+
+def test_touched_file_stays_valid(corpus):
+    index = CorpusIndex(corpus / "index.json")
+    path = corpus / "doc_0.txt"
+    index.put(path, partials)
+    os.utime(path, (0, 0))
+    assert index.get(path, ["words"]) is not None
+    path.write_text("Changed.")
+    assert index.get(path, ["words"]) is None
+
+def test_signature_mismatch(corpus):
+    index = CorpusIndex(corpus / "index.json", {"options": {"sent": "lexicon"}})
+    index.put(corpus / "doc_0.txt", partials)
+    index.save()
+    assert CorpusIndex(corpus / "index.json", {"options": {"sent": "lexicon"}}).files
+    assert not CorpusIndex(corpus / "index.json", {"options": {"sent": "textblob"}}).files
+
+def test_index_partials_only_parses_changes(corpus):
+    focus = ["text", "words", "sent"]
+    files = sorted(corpus.glob("*.txt"))
+    first = index_partials(files, focus, CorpusIndex(corpus / "index.json"))
+    files[1].write_text("A wonderful morning.")
+    index = CorpusIndex(corpus / "index.json")
+    assert [index.get(f, focus) is None for f in files] == [False, True, False]
+    second = index_partials(files, focus, index)
+    modules = plug_aggregators(focus)
+    assert finalize_partials(modules, second[0][1]) == finalize_partials(modules, first[0][1])
+    expected = analyze_stream(["A wonderful morning."], focus)
+    assert finalize_partials(modules, second[1][1]) == expected
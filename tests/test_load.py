@@ -0,0 +1,101 @@
+import pytest
+from src.utils.load import collect_files, discover_files, iter_file, iter_files, load_file, load_files, stream_files
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    for i in range(10):
+        (tmp_path / f"doc_{i}.txt").write_text(f"Document number {i}.\n\nSecond line {i}.")
+    return tmp_path
+
+
+def test_iter_files_order(corpus):
+    files = collect_files([corpus])
+    loaded = list(iter_files([corpus], max_workers=4, prefetch=2))
+    assert [f for f, _ in loaded] == files
+    assert [text for _, text in loaded] == [load_file(f) for f in files]
+
+def test_iter_files_sequential(corpus):
+    assert list(iter_files([corpus], max_workers=1)) == list(iter_files([corpus], max_workers=4))
+
+def test_iter_files_early_close(corpus):
+    loaded = iter_files([corpus], max_workers=4, prefetch=2)
+    first = next(loaded)
+    loaded.close()
+    assert first[1] == load_file(first[0])
+
+def test_iter_files_missing_path(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        iter_files([tmp_path / "missing.txt"])
+
+def test_load_files_modes(corpus):
+    texts = list(load_files([corpus]))
+    separate = load_files([corpus], mode="separate")
+    assert list(separate.values()) == texts
+    assert list(separate) == [f.name for f in collect_files([corpus])]
+
+def test_iter_file_blocks(tmp_path):
+    path = tmp_path / "long.txt"
+    path.write_text("".join(f"  line {i}\r\n\n" for i in range(1000)))
+    blocks = list(iter_file(path, block_size=100))
+    assert len(blocks) > 1
+    assert all(len(block) <= 120 for block in blocks)
+    assert "".join(blocks) == "\n".join(f"line {i}" for i in range(1000))
+
+def test_iter_file_empty(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("")
+    assert load_file(path) == ""
+
+def test_stream_files(corpus):
+    streamed = [(f, "".join(blocks)) for f, blocks in stream_files([corpus])]
+    assert streamed == list(iter_files([corpus]))
+
+@pytest.fixture
+def tree(tmp_path):
+    for relative, text in {
+        "b.txt": "Top level b.",
+        "a.txt": "Top level a.",
+        "skip.csv": "Not a document.",
+        "sub/c.txt": "Nested c.",
+        "sub/copy.txt": "Top level a.",
+        "sub/deep/d.txt": "Deeper d, a little longer.",
+        "drafts/e.txt": "Draft e."
+    }.items():
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return tmp_path
+
+
+def relative(files, root):
+    return [f.relative_to(root).as_posix() for f in files]
+
+def test_discover_top_level(tree):
+    assert relative(discover_files([tree]), tree) == ["a.txt", "b.txt"]
+
+def test_discover_recursive_sorted(tree):
+    assert relative(discover_files([tree], max_depth=None), tree) == [
+        "a.txt", "b.txt", "drafts/e.txt", "sub/c.txt", "sub/copy.txt", "sub/deep/d.txt"
+    ]
+
+def test_discover_max_depth(tree):
+    assert "sub/deep/d.txt" not in relative(discover_files([tree], max_depth=1), tree)
+    assert "sub/c.txt" in relative(discover_files([tree], max_depth=1), tree)
+
+def test_discover_patterns(tree):
+    files = discover_files([tree], max_depth=None, include=["sub/*"], exclude=["deep"])
+    assert relative(files, tree) == ["sub/c.txt", "sub/copy.txt"]
+
+def test_discover_sizes(tree):
+    files = discover_files([tree], max_depth=None, min_size=10, max_size=12)
+    assert relative(files, tree) == ["a.txt", "b.txt", "sub/copy.txt"]
+
+def test_discover_dedupe(tree):
+    files = relative(discover_files([tree], max_depth=None, dedupe=True), tree)
+    assert "a.txt" in files and "sub/copy.txt" not in files
+    assert len(files) == 5
+
+def test_discover_is_lazy(tree):
+    files = discover_files([tree], max_depth=None)
+    assert next(files).name == "a.txt"
@@ -0,0 +1,75 @@
+import math
+from collections import Counter
+import pytest
+from src.analyzer import Analyzer, analyze_stream, required_pipes
+from src.modules.ngrams import NgramsModule
+from src.utils.chunk import iter_chunks
+
+
+sample_text = (
+    "New York is big. I love New York. New York has many people. "
+    "The people of New York are busy. Many people love the city."
+)
+
+analyzer = Analyzer(sample_text)
+
+def test_counts_match_python():
+    bigrams = Counter()
+    for sent in analyzer.get_input("sents"):
+        words = [token.lower_ for token in sent if token.is_alpha]
+        bigrams.update(zip(words, words[1:]))
+    result = NgramsModule(analyzer, rank="count", min_count=1, top_n=None).analyze()
+    assert {tuple(name.split()): stats["count"] for name, stats in result.items()} == bigrams
+    assert list(result)[0] == "new york"
+
+def test_scores():
+    words = [word.lower() for word in analyzer.get_words()]
+    unigrams = Counter(words)
+    total = len(words)
+    stats = NgramsModule(analyzer).analyze()["new york"]
+    pmi = math.log2(4 * total / (unigrams["new"] * unigrams["york"]))
+    assert stats["pmi"] == pytest.approx(pmi, abs=1e-3)
+    assert stats["llr"] > NgramsModule(analyzer).analyze()["many people"]["llr"]
+
+def test_trigrams():
+    result = NgramsModule(analyzer, n=3, rank="count", min_count=1).analyze()
+    assert result["i love new"]["count"] == 1
+    assert all(len(name.split()) == 3 for name in result)
+
+def test_partials_match_analyze():
+    module = NgramsModule(analyzer, top_n=5)
+    assert module.finalize(module.partial()) == module.analyze()
+
+def test_stream_counts():
+    chunks = iter_chunks(sample_text, 40)
+    result = analyze_stream(chunks, ["ngrams"], options={"ngrams": {"rank": "count"}})
+    assert result["ngrams"]["new york"]["count"] == 4
+
+lines_text = (
+    "Rainy days make people sad\n"
+    "but rainy days help the garden grow\n\n"
+    "The garden needs rain. Rainy days are good!\n"
+    "People say rainy days never end\n"
+) * 5
+
+@pytest.mark.parametrize("chunk_size", [1000, 50])
+def test_stream_matches_single_shot(chunk_size):
+    options = {"ngrams": {"min_count": 1, "top_n": None}}
+    single = NgramsModule(Analyzer(lines_text), min_count=1, top_n=None).analyze()
+    streamed = analyze_stream(iter_chunks(lines_text, chunk_size), ["ngrams"], options=options)
+    assert streamed["ngrams"] == single
+
+def test_ngrams_stop_at_lines_and_sentences():
+    result = NgramsModule(Analyzer(lines_text), min_count=1, top_n=None).analyze()
+    assert "rainy days" in result
+    assert "sad but" not in result
+    assert "rain rainy" not in result
+    assert "good people" not in result
+
+def test_preprocessed():
+    assert "lemmatizer" in required_pipes(["ngrams"], {"ngrams": {"preprocessed": True}})
+    assert "lemmatizer" not in required_pipes(["ngrams"])
+    lemmas = Analyzer(sample_text, focus=["ngrams"], options={"ngrams": {"preprocessed": True}})
+    result = NgramsModule(lemmas, preprocessed=True, min_count=1, top_n=None).analyze()
+    assert "people love" in result
+    assert not any("the" in name.split() for name in result)
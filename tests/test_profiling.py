@@ -0,0 +1,79 @@
+import pstats
+import time
+from collections import Counter
+from src.utils.profiling import Profiler, collapse_stats
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+def collapsed(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.rsplit(" ", 1) for line in f.read().splitlines()]
+
+def test_collapse_splits_time_by_caller():
+    a, b, c = ("a.py", 1, "a"), ("b.py", 1, "b"), ("c.py", 1, "c")
+    stats = {
+        a: (1, 1, 1.0, 4.0, {}),
+        b: (1, 1, 1.0, 3.0, {a: (1, 1, 1.0, 3.0)}),
+        c: (2, 2, 2.0, 2.0, {b: (2, 2, 2.0, 2.0)})
+    }
+    lines = Counter()
+    collapse_stats(stats, "phase:x", lines)
+    assert lines == {
+        "phase:x;a (a.py:1)": 1.0,
+        "phase:x;a (a.py:1);b (b.py:1)": 1.0,
+        "phase:x;a (a.py:1);b (b.py:1);c (c.py:1)": 2.0
+    }
+
+def test_cprofile_tags_phases(tmp_path):
+    profiler = Profiler("cprofile")
+    profiler.start()
+    with profiler.phase("work"):
+        busy(0.05)
+    profiler.stop()
+    paths = profiler.save("run", tmp_path)
+    assert [p.split("/")[-1] for p in paths] == ["run.pstats", "run.collapsed.txt"]
+    stats = pstats.Stats(paths[0])
+    assert any(func[2] == "busy" for func in stats.stats)
+    stacks = collapsed(paths[1])
+    assert any(s.startswith("phase:work;") and "busy (test_profiling.py" in s for s, _ in stacks)
+    assert not any(s.startswith("phase:main;") and "busy (" in s for s, _ in stacks)
+    assert profiler.phases["work"]["calls"] == 1
+
+def test_sampling_profiler(tmp_path):
+    profiler = Profiler("sample", interval=0.001)
+    profiler.start()
+    with profiler.phase("work"):
+        busy(0.2)
+    profiler.stop()
+    paths = profiler.save("run", tmp_path)
+    stats = pstats.Stats(paths[0])
+    busy_stats = next(v for func, v in stats.stats.items() if func[2] == "busy")
+    assert busy_stats[3] > 0
+    stacks = collapsed(paths[1])
+    assert any(s.startswith("phase:work;") and s.endswith("busy (test_profiling.py:7)") for s, _ in stacks)
+    assert not any(s.startswith("thread:climt-profiler") for s, _ in stacks)
+
+def test_per_document_profiles(tmp_path):
+    profiler = Profiler("cprofile", per_document=True)
+    profiler.start()
+    for name in ("docs/a.txt", "docs/sub/a.txt"):
+        with profiler.phase("work"):
+            busy(0.01)
+        profiler.flush(name)
+    profiler.stop()
+    paths = profiler.save("run", tmp_path)
+    names = sorted(p.split("/")[-1] for p in paths)
+    assert names == [
+        "run.a.collapsed.txt", "run.a.pstats",
+        "run.collapsed.txt", "run.pstats",
+        "run.sub__a.collapsed.txt", "run.sub__a.pstats"
+    ]
+    calls = [pstats.Stats(str(tmp_path / f"run{n}.pstats")).stats for n in (".a", ".sub__a", "")]
+    counts = [next(v[1] for func, v in s.items() if func[2] == "busy") for s in calls]
+    assert counts == [1, 1, 2]
@@ -16,4 +16,23 @@ def test_analyze():
     assert 0 <= result["gunning_fog"] <= 20
     assert 0 <= result["smog_index"] <= 20
     assert 0 <= result["automated_readability_index"] <= 20
-    assert 0 <= result["coleman_liau_index"] <= 20
\ No newline at end of file
+    assert 0 <= result["coleman_liau_index"] <= 20
+
+def test_default_backend():
+    assert readability_module.backend == "native"
+
+def test_counts_match_text_module():
+    counts = readability_module.partial()
+    assert counts["sentences"] == 1
+    assert counts["words"] == 21
+    assert counts["letters"] == sum(len(word) for word in analyzer.get_words())
+    assert counts["polysyllables"] == 1
+
+def test_textstat_backend():
+    result = ReadabilityModule(analyzer, backend="textstat").analyze()
+    assert 0 <= result["flesch_reading_ease"] <= 120
+    assert 0 <= result["smog_index"] <= 20
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        ReadabilityModule(analyzer, backend="unknown").analyze()
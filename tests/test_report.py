@@ -0,0 +1,82 @@
+import csv
+import json
+import pytest
+from src.utils.load import collect_files
+from src.utils.report import ReportWriter, flatten, save_report
+
+
+analysis = {
+    "text": {"word_count": 4, "character_count": 22},
+    "words": {"good": {"count": 2, "freq": 50.0}}
+}
+
+
+def test_flatten():
+    assert list(flatten(analysis)) == [
+        ("text.word_count", 4),
+        ("text.character_count", 22),
+        ("words.good.count", 2),
+        ("words.good.freq", 50.0)
+    ]
+
+def test_jsonl_writer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with ReportWriter("report", "jsonl", flush_every=1) as writer:
+        writer.write(analysis, "a.txt")
+        writer.write(analysis, "b.txt")
+        assert len((tmp_path / "output" / "report.jsonl").read_text().splitlines()) == 2
+    lines = (tmp_path / "output" / "report.jsonl").read_text().splitlines()
+    assert [json.loads(line)["document"] for line in lines] == ["a.txt", "b.txt"]
+    assert json.loads(lines[0])["words"]["good"]["count"] == 2
+
+def test_csv_writer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with ReportWriter("report", "csv") as writer:
+        writer.write(analysis, "a.txt")
+    with open(tmp_path / "output" / "report.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["document", "module", "key", "value"]
+    assert rows[1] == ["a.txt", "text", "word_count", "4"]
+    assert len(rows) == 5
+
+def test_txt_writer_one_file_per_document(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with ReportWriter("report", "txt") as writer:
+        writer.write(analysis, "a.txt")
+        writer.write(analysis, "b.docx")
+    assert sorted(p.name for p in (tmp_path / "output").iterdir()) == ["a_report.txt", "b_report.txt"]
+
+def test_duplicate_pointers_keep_the_reports(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pointer = {"duplicate": {"of": "d3/report.docx", "similarity": 1.0}}
+    with ReportWriter("nd", "md") as writer:
+        writer.write(analysis, "d3/report.docx")
+        writer.write(pointer, "d3/report.pdf")
+        writer.write(pointer, "d3/x/report.txt")
+    output = tmp_path / "output"
+    assert sorted(p.name for p in output.iterdir()) == ["report_nd.md", "report_pdf_nd.md", "x__report_nd.md"]
+    assert "DUPLICATE" not in (output / "report_nd.md").read_text()
+    assert "DUPLICATE" in (output / "report_pdf_nd.md").read_text()
+
+def test_same_named_files_in_nested_directories(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "docs" / "sub").mkdir(parents=True)
+    (tmp_path / "docs" / "notes.txt").write_text("Top.")
+    (tmp_path / "docs" / "sub" / "notes.txt").write_text("Nested.")
+    files = collect_files([tmp_path / "docs"], max_depth=None)
+    with ReportWriter("out", "txt") as writer:
+        for f in files:
+            writer.write({"text": {"source": f.read_text()}}, str(f))
+    output = tmp_path / "output"
+    assert sorted(p.name for p in output.iterdir()) == ["notes_out.txt", "sub__notes_out.txt"]
+    assert "Top." in (output / "notes_out.txt").read_text()
+    assert "Nested." in (output / "sub__notes_out.txt").read_text()
+
+def test_save_report_jsonl(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    save_report(analysis, "single", "jsonl")
+    assert json.loads((tmp_path / "output" / "single.jsonl").read_text())["document"] is None
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        ReportWriter("report", "xml")
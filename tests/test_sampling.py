@@ -0,0 +1,74 @@
+import numpy as np
+from src.analyzer import analyze_sample, plug_aggregators, sample_partials
+from src.utils.sampling import SampleEstimator, distinct_estimate, sample_units, split_units
+
+
+paragraphs = [
+    f"Paragraph {i} is {'good' if i % 3 else 'bad'}. It has two sentences!"
+    for i in range(60)
+]
+text = "\n".join(paragraphs)
+
+rng = np.random.default_rng(0)
+vocabulary = ["".join(rng.choice(list("abcdefghijklmnopqrstuvwxyz"), 6)) for _ in range(5000)]
+frequencies = 1 / np.arange(1, 5001) ** 1.05
+zipf = [
+    " ".join(vocabulary[i] for i in rng.choice(5000, 20, p=frequencies / frequencies.sum())) + "."
+    for _ in range(1000)
+]
+
+def test_split_units():
+    assert split_units("One. Two?\n\nThree!") == ["One. Two?", "Three!"]
+    assert split_units("One. Two?\n\nThree!", "sentence") == ["One.", "Two?", "Three!"]
+
+def test_sample_units_reproducible():
+    units, strata, sizes, count = sample_units([text, text], 0.25, seed=7, stratum_size=40)
+    again = sample_units([text, text], 0.25, seed=7, stratum_size=40)
+    assert units == again[0]
+    assert sizes == [(40, 10), (20, 5), (40, 10), (20, 5)]
+    assert strata.tolist() == [0] * 10 + [1] * 5 + [2] * 10 + [3] * 5
+    assert count == 120
+    assert all(unit in paragraphs for unit in units)
+
+def test_full_sample_is_exact():
+    focus = ["text", "words"]
+    units, strata, sizes, count = sample_units([text], 1.0, seed=0)
+    partials = list(sample_partials(units, focus))
+    estimator = SampleEstimator(plug_aggregators(focus), partials, strata, sizes, seed=0)
+    estimate = estimator.estimate(bootstrap=20)
+    assert estimate["text"]["word_count"] == 60 * 7
+    assert estimate["text"]["sentence_count"] == 120
+    assert estimate["words"]["good"]["count"] == 40
+    assert estimate["sample"]["intervals"]["words.good.count"][0] <= 40
+    assert estimate["text"]["unique_word_count"] == 8
+    assert estimate["sample"]["intervals"]["text.unique_word_count"] == [8, 8]
+    assert estimate["sample"]["observed"] == {"text.unique_word_count": 8}
+
+def test_distinct_estimate():
+    incidence = np.array([1, 1, 1, 1, 2, 2, 3, 5])
+    assert distinct_estimate(incidence, 10, 10) == 8
+    assert distinct_estimate(incidence, 1, 100) == 8
+    assert distinct_estimate(np.array([2, 3, 5]), 10, 100) == 3
+    assert 8 < distinct_estimate(incidence, 10, 1000) < distinct_estimate(incidence, 10, 10**6)
+
+def test_sample_unique_word_count():
+    true = len({word for paragraph in zipf for word in paragraph[:-1].split()})
+    analysis = analyze_sample(["\n".join(zipf)], ["text"], 0.1, seed=1, bootstrap=50)
+    estimate = analysis["text"]["unique_word_count"]
+    observed = analysis["sample"]["observed"]["text.unique_word_count"]
+    low, high = analysis["sample"]["intervals"]["text.unique_word_count"]
+    assert observed < estimate <= true
+    assert true - estimate < (true - observed) / 2
+    assert observed < low < estimate < high
+
+def test_analyze_sample():
+    analysis = analyze_sample([text], ["text", "read", "sent"], 0.5, seed=1, bootstrap=50)
+    intervals = analysis["sample"]["intervals"]
+    assert analysis["sample"]["units"] == 30
+    assert analysis["text"]["paragraph_count"] == 60
+    assert abs(analysis["text"]["word_count"] - 420) < 60
+    low, high = intervals["text.word_count"]
+    assert low <= analysis["text"]["word_count"] <= high
+    assert "read.flesch_reading_ease" in intervals
+    assert "sent.overall.polarity" in intervals
+    assert analysis == analyze_sample([text], ["text", "read", "sent"], 0.5, seed=1, bootstrap=50)
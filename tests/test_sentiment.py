@@ -20,4 +20,47 @@ def test_analyze():
     for _, data in sentences.items():
         assert -1 <= data["polarity"] <= 1
         assert 0 <= data["subjectivity"] <= 1
-        
\ No newline at end of file
+
+
+textblob_module = SentimentModule(analyzer, backend="textblob")
+
+mixed_text = "This movie was not good at all. The acting was really terrible! I loved the soundtrack though :)"
+mixed_analyzer = Analyzer(mixed_text)
+
+
+def test_default_backend():
+    assert sentiment_module.backend == "lexicon"
+
+def test_lexicon_matches_textblob():
+    assert sentiment_module.analyze() == textblob_module.analyze()
+
+def test_lexicon_matches_textblob_on_negation_and_modifiers():
+    lexicon = SentimentModule(mixed_analyzer).analyze()
+    textblob = SentimentModule(mixed_analyzer, backend="textblob").analyze()
+    assert lexicon["overall"] == pytest.approx(textblob["overall"], abs=1e-3)
+    for expected, actual in zip(textblob["sentences"].values(), lexicon["sentences"].values()):
+        assert actual["polarity"] == pytest.approx(expected["polarity"], abs=1e-3)
+        assert actual["subjectivity"] == pytest.approx(expected["subjectivity"], abs=1e-3)
+
+@pytest.mark.parametrize("text", [
+    "This isn't good.",
+    "I don't love it.",
+    "It isn't bad at all!!!",
+    "What a great idea (!) Really.",
+    "I <3 it :) but : ( and xD, sadly :'(",
+    "Mr. Smith isn't very happy... The U.S. team is \"really\" good!!",
+    "Really not good. Very. Good day"
+])
+def test_lexicon_matches_textblob_tokenization(text):
+    parsed = Analyzer(text)
+    lexicon = SentimentModule(parsed).analyze()
+    textblob = SentimentModule(parsed, backend="textblob").analyze()
+    assert lexicon["overall"] == pytest.approx(textblob["overall"], abs=1e-9)
+    for expected, actual in zip(textblob["sentences"].values(), lexicon["sentences"].values()):
+        assert actual["polarity"] == pytest.approx(expected["polarity"], abs=1e-9)
+        assert actual["subjectivity"] == pytest.approx(expected["subjectivity"], abs=1e-9)
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        SentimentModule(analyzer, backend="unknown").analyze()
+
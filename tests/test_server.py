@@ -0,0 +1,79 @@
+import asyncio
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.analyzer import Analyzer
+from src.server import BatchAnalyzer, Server
+
+
+texts = [f"Request number {i} has a good day." for i in range(8)]
+
+loop = asyncio.new_event_loop()
+threading.Thread(target=loop.run_forever, daemon=True).start()
+batch_analyzer = BatchAnalyzer(batch_size=8, max_wait=0.2)
+batch_analyzer.warm(["text", "words"])
+server = Server(batch_analyzer, ["text", "words"])
+asyncio.run_coroutine_threadsafe(server.start("127.0.0.1", 0), loop).result()
+port = server.server.sockets[0].getsockname()[1]
+
+
+def post(payload, path="/analyze"):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}{path}",
+        data=json.dumps(payload).encode(),
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def expected(text, focus):
+    analyzer = Analyzer(text, focus)
+    analyzer.plug_modules(focus)
+    return analyzer.generate_analysis()
+
+
+def test_analyze():
+    status, response = post({"text": texts[0]})
+    assert status == 200
+    assert response["analysis"] == expected(texts[0], ["text", "words"])
+
+def test_concurrent_requests_are_batched():
+    before = batch_analyzer.batches
+    with ThreadPoolExecutor(len(texts)) as pool:
+        responses = list(pool.map(lambda text: post({"text": text, "analyze": ["text"]}), texts))
+    assert [r["analysis"] for _, r in responses] == [expected(text, ["text"]) for text in texts]
+    assert batch_analyzer.batches - before < len(texts)
+    assert post({}, "/health")[1]["batches"] == batch_analyzer.batches
+
+def test_report_output():
+    status, response = post({"text": texts[0], "output": "md"})
+    assert response["report"].startswith("# DATA REPORT")
+
+def test_bad_requests():
+    assert post({"text": ""})[0] == 400
+    assert post({"text": "Hi.", "analyze": ["nope"]})[0] == 400
+    assert post({"text": "Hi.", "sentiment_backend": "nope"})[0] == 400
+    assert post({"text": "Hi."}, path="/missing")[0] == 404
+
+def test_unix_socket(tmp_path):
+    path = str(tmp_path / "climt.sock")
+    unix_server = Server(batch_analyzer, ["text"])
+    asyncio.run_coroutine_threadsafe(unix_server.start(socket=path), loop).result()
+    body = json.dumps({"text": texts[1]}).encode()
+    with socket.socket(socket.AF_UNIX) as client:
+        client.connect(path)
+        client.sendall(b"POST /analyze HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+        response = b""
+        while chunk := client.recv(65536):
+            response += chunk
+    assert response.startswith(b"HTTP/1.1 200")
+    analysis = json.loads(response.split(b"\r\n\r\n", 1)[1])["analysis"]
+    assert analysis == expected(texts[1], ["text"])
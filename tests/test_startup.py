@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+UNUSED_LIBRARIES = {"matplotlib", "textblob", "textstat", "PyPDF2", "docx"}
+
+# Cumulative import time allowed for climt's own modules on --help, in µs.
+HELP_IMPORT_BUDGET = 150_000
+
+
+def import_times(args, cwd) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", str(SRC / "main.py"), *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stderr
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+def top_level(times) -> set:
+    return {name.split(".")[0] for name in times}
+
+
+def test_help_skips_heavy_imports(tmp_path):
+    times = import_times(["--help"], tmp_path)
+    assert not top_level(times) & (UNUSED_LIBRARIES | {"spacy", "tabulate"})
+    own = ("config", "analyzer", "utils")
+    assert sum(t for name, t in times.items() if name.startswith(own)) < HELP_IMPORT_BUDGET
+
+def test_text_analysis_skips_unused_libraries(tmp_path):
+    args = ["A short text.", "--analyze", "text", "--output", "txt", "--outfile", "report"]
+    times = import_times(args, tmp_path)
+    assert "spacy" in times
+    assert not top_level(times) & UNUSED_LIBRARIES
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from src.analyzer import Analyzer
+from src.modules.tfidf import DocumentTermMatrix, TfidfModule
+
+
+texts = [
+    "The cat sat on the mat. The cat purred.",
+    "The dog sat on the log. The dog barked at the cat.",
+    "Stocks fell as the markets closed."
+]
+
+def test_matrix():
+    matrix = DocumentTermMatrix()
+    matrix.add([5, 7], [2, 1])
+    matrix.add([], [])
+    matrix.add([7, 9], [1, 3])
+    matrix.build()
+    assert len(matrix) == 3
+    assert matrix.indptr.tolist() == [0, 2, 2, 4]
+    assert matrix.vocabulary.tolist() == [5, 7, 9]
+    assert matrix.indices.tolist() == [0, 1, 1, 2]
+    assert matrix.document_frequency().tolist() == [1, 2, 1]
+    scores = matrix.tfidf()
+    idf = np.log(4 / np.array([2, 3, 3, 2])) + 1
+    expected = np.array([2, 1, 1, 3]) * idf
+    expected[:2] /= np.linalg.norm(expected[:2])
+    expected[2:] /= np.linalg.norm(expected[2:])
+    assert scores == pytest.approx(expected)
+    kept, bounds = matrix.top(scores, 1)
+    assert matrix.indices[kept].tolist() == [0, 2]
+    assert bounds.tolist() == [0, 1, 1, 2]
+
+def test_tfidf_module():
+    module = TfidfModule(top_n=3)
+    for text in texts:
+        module.add(Analyzer(text))
+    documents, corpus = module.finalize()
+    assert list(documents[0])[:2] == ["the", "cat"]
+    assert list(documents[1])[:2] == ["the", "dog"]
+    assert "the" not in documents[2]
+    assert documents[2]["stocks"] == pytest.approx(0.4324, abs=1e-4)
+    assert corpus["documents"] == 3
+    assert corpus["terms"] == 15
+    assert list(corpus["document_frequency"].items())[:2] == [("the", 3), ("cat", 2)]
@@ -0,0 +1,87 @@
+import pytest
+import time
+import tracemalloc
+from src.analyzer import Analyzer, analyze_corpus, analyze_stream
+from src.utils.timings import Timings, iter_phase, phase
+
+
+sample_text = "The weather is good today. I really like it.\n\nBut the traffic is terrible."
+
+timings = Timings(trace_memory=True)
+analyzer = Analyzer(sample_text, ["text", "sent"], timings=timings)
+analyzer.plug_modules(["text", "sent"])
+analyzer.generate_analysis()
+tracemalloc.stop()
+
+
+def test_phases_recorded():
+    assert {"model_load", "parse", "module.text", "module.sent"} <= set(timings.phases)
+    for stats in timings.phases.values():
+        assert stats["calls"] >= 1
+        assert stats["wall"] >= 0
+        assert stats["memory_peak"] is not None
+
+def test_token_count():
+    assert timings.tokens == len(analyzer.doc)
+
+def test_nested_phases():
+    t = Timings(trace_memory=True)
+    with t.phase("outer"):
+        with t.phase("inner"):
+            data = [0] * 100_000
+        del data
+    tracemalloc.stop()
+    assert t.phases["outer"]["memory_peak"] >= t.phases["inner"]["memory_peak"] > 0
+
+def test_nested_phase_time_is_exclusive():
+    t = Timings()
+    with t.phase("outer"):
+        with t.phase("inner"):
+            time.sleep(0.05)
+    assert t.phases["inner"]["wall"] >= 0.05
+    assert t.phases["outer"]["wall"] < 0.05
+    assert sum(stats["wall"] for stats in t.phases.values()) <= t.summary()["total"]["wall"]
+
+def test_loading_is_not_parse_time():
+    t = Timings()
+
+    def load():
+        for text in ["One text here.", "Another text.", "A third one."]:
+            time.sleep(0.05)
+            yield text
+
+    texts = iter_phase(t, "load_files", load())
+    analyzers = list(analyze_corpus(texts, ["text"], batch_size=2, timings=t))
+    assert len(analyzers) == 3
+    assert t.phases["load_files"]["wall"] >= 0.15
+    assert t.phases["parse"]["wall"] < 0.15
+    assert sum(stats["wall"] for stats in t.phases.values()) <= t.summary()["total"]["wall"]
+
+def test_summary_throughput():
+    t = Timings(trace_memory=False)
+    with t.phase("parse"):
+        pass
+    t.count(documents=2, tokens=10)
+    summary = t.summary()
+    assert summary["documents"] == 2
+    assert summary["throughput"]["docs_per_sec"] > 0
+    assert summary["phases"]["parse"]["memory_peak"] is None
+
+def test_memory_tracing_is_opt_in():
+    t = Timings()
+    with t.phase("load"):
+        data = [0] * 1_000_000
+    del data
+    assert not tracemalloc.is_tracing()
+    assert t.phases["load"]["memory_peak"] is None
+    assert t.phases["load"]["rss_growth"] >= 0
+
+def test_stream_timings():
+    t = Timings(trace_memory=False)
+    analyze_stream(["One chunk here.\n", "Another chunk."], ["text"], timings=t)
+    assert t.phases["parse"]["calls"] == 2
+    assert t.phases["module.text"]["calls"] == 4
+
+def test_phase_without_timings():
+    with phase(None, "parse"):
+        pass
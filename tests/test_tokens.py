@@ -0,0 +1,33 @@
+import pytest
+from collections import Counter
+from src.analyzer import Analyzer
+from src.utils.tokens import TokenTable
+
+
+sample_text = "Blessed is he who, in the name of charity and good will, shepherds the weak through the valley of the darkness."
+
+analyzer = Analyzer(sample_text)
+tokens = TokenTable(analyzer.doc)
+lower_words = [token.lower_ for token in analyzer.doc if token.is_alpha]
+
+
+def test_columns():
+    assert len(tokens) == len(analyzer.doc)
+    assert int(tokens.alpha.sum()) == len(analyzer.get_words())
+
+def test_counts_match_counter():
+    counts = tokens.counts("lower", tokens.alpha)
+    assert counts == Counter(lower_words)
+    assert list(counts) == list(Counter(lower_words))
+
+def test_most_common_ties():
+    assert tokens.most_common("lower", 5, tokens.alpha) == Counter(lower_words).most_common(5)
+
+def test_pos_counts():
+    pos = [token.pos_ for token in analyzer.doc if token.is_alpha]
+    assert tokens.counts("pos", tokens.alpha) == Counter(pos)
+
+def test_empty_doc():
+    empty = TokenTable(Analyzer("").doc)
+    assert len(empty) == 0
+    assert empty.counts("lower", empty.alpha) == {}
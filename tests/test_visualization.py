@@ -0,0 +1,38 @@
+from pathlib import Path
+from src.utils.visualization import PlotWriter, get_renderer
+
+
+analysis = {
+    "words": {"good": {"count": 2, "freq": 50.0}, "day": {"count": 1, "freq": 25.0}},
+    "pos": {"NOUN": {"count": 1, "freq": 33.33}, "ADJ": {"count": 2, "freq": 66.67}},
+    "text": {"paragraphs": 1}
+}
+
+def test_renderer_reuses_figure():
+    assert get_renderer() is get_renderer()
+
+def test_plot_writer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with PlotWriter("report", max_workers=1) as plots:
+        plots.write(analysis, "docs/a.txt")
+        plots.write({"text": {"paragraphs": 1}}, "docs/b.txt")
+    assert sorted(Path(f).name for f in plots.files) == ["a_report_pos.png", "a_report_words.png"]
+    assert all(Path(f).read_bytes().startswith(b"\x89PNG") for f in plots.files)
+
+def test_plot_writer_nested_same_names(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with PlotWriter("report", max_workers=1) as plots:
+        plots.write(analysis, "docs/notes.txt")
+        plots.write(analysis, "docs/sub/notes.txt")
+    assert sorted(Path(f).name for f in plots.files) == [
+        "notes_report_pos.png", "notes_report_words.png",
+        "sub__notes_report_pos.png", "sub__notes_report_words.png"
+    ]
+
+def test_plot_writer_processes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with PlotWriter("report", max_workers=2) as plots:
+        for name in ("a", "b", "c"):
+            plots.write(analysis, f"{name}.txt")
+    assert len(plots.files) == 6
+    assert all(Path(f).exists() for f in plots.files)
@@ -16,3 +16,37 @@ def test_analyze():
     assert result["charity"]["count"] == 1
     assert result["blessed"]["freq"] == pytest.approx(100 / 21, rel=1e-2)
     assert result["charity"]["freq"] == pytest.approx(100 / 21, rel=1e-2)
+
+def test_sketch_bounds():
+    from collections import Counter
+    from src.utils.sketch import SpaceSaving
+    chunks = [Counter("aaaabbbcd"), Counter("aaeeefgh"), Counter("bbbiaj")]
+    exact = sum(chunks, Counter())
+    sketch = SpaceSaving(4)
+    for chunk in chunks:
+        sketch.merge(SpaceSaving(4).update(chunk))
+    assert len(sketch) == 4
+    assert sketch.most_common(2)[0][0] == "a"
+    for item, count, error in sketch.most_common():
+        assert count - error <= exact[item] <= count
+    assert sketch.floor <= sum(exact.values()) / 4
+
+def test_sketch_merge():
+    texts = [sample_text, "The valley of the weak and the good.", "Charity shepherds the weak."]
+    exact = WordsModule(None)
+    approx = WordsModule(None, top_n=3, sketch_size=8)
+    partials = [WordsModule(Analyzer(text), sketch_size=8).partial() for text in texts]
+    exact_partials = [WordsModule(Analyzer(text)).partial() for text in texts]
+    merged = partials[0]
+    for partial in partials[1:]:
+        merged = approx.merge(merged, partial)
+    exact_merged = exact_partials[0]
+    for partial in exact_partials[1:]:
+        exact_merged = exact.merge(exact_merged, partial)
+    assert len(merged["counts"]) == 8
+    assert merged["total"] == exact_merged["total"]
+    result = approx.finalize(merged)
+    assert list(result)[0] == "the"
+    for word, stats in result.items():
+        true = exact_merged["counts"][word]
+        assert stats["count"] - stats["error"] <= true <= stats["count"]